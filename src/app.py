@@ -13,7 +13,10 @@ except Exception:  # pragma: no cover
 
 
 def create_app() -> FastAPI:
-    app = FastAPI(title="pokemon-za MCP", version="0.1.0")
+    from src.tools import FastJSONResponse, register_tools
+
+    # orjson があれば orjson.dumps（無ければ stdlib json）でエンコードするレスポンスを既定にする
+    app = FastAPI(title="pokemon-za MCP", version="0.1.0", default_response_class=FastJSONResponse)
 
     # Initialize MCP if available
     mcp = None
@@ -37,8 +40,6 @@ def create_app() -> FastAPI:
             mcp = None
 
     # Register tools (both MCP and REST fallbacks)
-    from src.tools import register_tools
-
     register_tools(app=app, mcp=mcp)
     # If MCP was created before endpoints, ensure re-registration per FAQ
     if mcp is not None and hasattr(mcp, "setup_server"):
@@ -1,98 +1,336 @@
 # src/code_environment.py
 from __future__ import annotations
 
+import ast
+import atexit
+import hashlib
 import io
+import itertools
 import json
 import math
+import os
 import re
+import signal
 import sqlite3
 import statistics
+import sys
+import threading
+import time
+import types
 import multiprocessing
-from multiprocessing import Process, Queue
+from multiprocessing.pool import Pool
+from collections import OrderedDict
 from contextlib import redirect_stdout
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
-from src.db import DEFAULT_DB_PATH
+from src.db import DEFAULT_DB_PATH, STATEMENT_CACHE_SIZE, configure_reader, readonly_uri
+
+# サンドボックス用の常駐ワーカー数（ZA_CODE_WORKERS で上書き可）
+POOL_SIZE = int(os.environ.get("ZA_CODE_WORKERS", str(min(4, os.cpu_count() or 1))))
+# 空きワーカーを待つ上限秒数（ZA_CODE_QUEUE_TIMEOUT で上書き可）。実行時間の timeout とは別枠
+QUEUE_TIMEOUT_SEC = float(os.environ.get("ZA_CODE_QUEUE_TIMEOUT", "30"))
+
+# POSIX は forkserver（親の状態を引き継がず、事前 import 済みのサーバから fork）、Windows は spawn
+if sys.platform == "win32":
+    _MP_CTX = multiprocessing.get_context("spawn")
+else:
+    _MP_CTX = multiprocessing.get_context("forkserver")
+    # 本モジュール自体も preload し、ワーカーは import 済みの状態から fork される（import は副作用なし）
+    _MP_CTX.set_forkserver_preload(
+        ["sqlite3", "json", "math", "statistics", "re", "src.db", "src.code_environment"]
+    )
+
+_POOL: Optional[Pool] = None
+_POOL_LOCK = threading.Lock()
+
+# プロセス内で使い回す読み取り専用接続（db_path ごと）
+_RO_CONNS: Dict[str, sqlite3.Connection] = {}
+
+
+# ユーザーコードに許す SQL 操作（接続は実行間で使い回すため、ATTACH/一時オブジェクト/設定系 PRAGMA は拒否）
+_AUTH_ALLOWED_ACTIONS = frozenset({
+    sqlite3.SQLITE_SELECT,
+    sqlite3.SQLITE_READ,
+    sqlite3.SQLITE_FUNCTION,
+    sqlite3.SQLITE_RECURSIVE,
+    sqlite3.SQLITE_TRANSACTION,
+    sqlite3.SQLITE_SAVEPOINT,
+})
+# 引数を取っても状態を変えない（表名を受け取るだけの）PRAGMA
+_AUTH_INFO_PRAGMAS = frozenset({"table_info", "table_xinfo", "index_list", "index_info", "index_xinfo", "foreign_key_list"})
+
+
+def _ro_authorizer(action: int, arg1: Optional[str], arg2: Optional[str], db_name: Optional[str], source: Optional[str]) -> int:
+    if action in _AUTH_ALLOWED_ACTIONS:
+        return sqlite3.SQLITE_OK
+    if action == sqlite3.SQLITE_PRAGMA and (arg2 is None or (arg1 or "").lower() in _AUTH_INFO_PRAGMAS):
+        return sqlite3.SQLITE_OK
+    if action == sqlite3.SQLITE_UPDATE and arg1 == "sqlite_master":
+        # json_each 等の組み込み仮想表を初回参照したときのスキーマ読み込みで呼ばれる（実際の更新は SQLite が拒否）
+        return sqlite3.SQLITE_OK
+    return sqlite3.SQLITE_DENY
 
 
 def _open_ro_conn(db_path: Optional[str]) -> sqlite3.Connection:
     path = db_path or DEFAULT_DB_PATH
-    # Read-only URI で開く
-    uri = f"file:{path}?mode=ro"
-    conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+    # Read-only URI で開く（ZA_DB_IMMUTABLE=1 なら immutable=1 も付ける）
+    uri = readonly_uri(path)
+    conn = sqlite3.connect(uri, uri=True, check_same_thread=False, cached_statements=STATEMENT_CACHE_SIZE)
     conn.row_factory = sqlite3.Row
     # 書き込み不可にする（更に保険）
     try:
         conn.execute("PRAGMA query_only = ON")
     except Exception:
         pass
+    # 接続を使い回すため、ページキャッシュ/mmap を大きめに取る（API の読み取り接続と同じ設定）
+    try:
+        configure_reader(conn)
+    except Exception:
+        pass
+    # 以降の SQL はユーザーコード由来なので、読み取り以外を拒否する
+    conn.set_authorizer(_ro_authorizer)
     return conn
 
 
-def _safe_builtins() -> Dict[str, Any]:
-    # 必要最低限の安全な builtin のみ許可（ファイルIO/exec/eval/__import__ は除外）
-    return {
-        "print": print,
-        "abs": abs,
-        "min": min,
-        "max": max,
-        "sum": sum,
-        "len": len,
-        "range": range,
-        "enumerate": enumerate,
-        "list": list,
-        "dict": dict,
-        "set": set,
-        "tuple": tuple,
-        "sorted": sorted,
-        "any": any,
-        "all": all,
-        "zip": zip,
-        "map": map,
-        "filter": filter,
-        "round": round,
-        "int": int,           # 必須：整数への変換
-        "float": float,       # 浮動小数点への変換
-        "str": str,           # 文字列への変換
-        "bool": bool,         # ブール値への変換
-        "isinstance": isinstance,  # 型チェック
-        "type": type,              # 型取得
-        "divmod": divmod,     # 除算と剰余を同時に取得
-        "pow": pow,           # べき乗計算
-    }
+def _get_ro_conn(db_path: Optional[str]) -> sqlite3.Connection:
+    """Return this process's cached read-only connection, opening it on first use."""
+    path = db_path or DEFAULT_DB_PATH
+    if path != DEFAULT_DB_PATH:
+        # 呼び出し側指定のパスはキャッシュしない（実行ごとに開いて閉じる）
+        return _open_ro_conn(path)
+    conn = _RO_CONNS.get(path)
+    if conn is None:
+        conn = _open_ro_conn(path)
+        _RO_CONNS[path] = conn
+    return conn
+
+
+def _release_ro_conn(db_path: Optional[str], conn: sqlite3.Connection) -> None:
+    """End any transaction left open by user code; close connections that are not cached."""
+    path = db_path or DEFAULT_DB_PATH
+    if _RO_CONNS.get(path) is not conn:
+        conn.close()
+        return
+    try:
+        conn.rollback()
+    except Exception:
+        # 使えなくなった接続は捨てて次回開き直す
+        _RO_CONNS.pop(path, None)
+
+
+# 必要最低限の安全な builtin のみ許可（ファイルIO/exec/eval/__import__ は除外）
+# import 時に一度だけ構築し、読み取り専用にする（常駐ワーカーで実行間に書き換えられないように）
+_SAFE_BUILTINS = types.MappingProxyType({
+    "print": print,
+    "abs": abs,
+    "min": min,
+    "max": max,
+    "sum": sum,
+    "len": len,
+    "range": range,
+    "enumerate": enumerate,
+    "list": list,
+    "dict": dict,
+    "set": set,
+    "tuple": tuple,
+    "sorted": sorted,
+    "any": any,
+    "all": all,
+    "zip": zip,
+    "map": map,
+    "filter": filter,
+    "round": round,
+    "int": int,           # 必須：整数への変換
+    "float": float,       # 浮動小数点への変換
+    "str": str,           # 文字列への変換
+    "bool": bool,         # ブール値への変換
+    "isinstance": isinstance,  # 型チェック
+    "type": type,              # 型取得
+    "divmod": divmod,     # 除算と剰余を同時に取得
+    "pow": pow,           # べき乗計算
+})
+
+class _ModuleView:
+    """モジュールの公開属性だけを読み取り専用で見せる（本物のモジュールは常駐ワーカー内で共有のため）。"""
+
+    __slots__ = ("_name", "_attrs")
+
+    def __init__(self, module: types.ModuleType) -> None:
+        names = getattr(module, "__all__", None) or [n for n in vars(module) if not n.startswith("_")]
+        attrs = {n: getattr(module, n) for n in names if not isinstance(getattr(module, n), types.ModuleType)}
+        object.__setattr__(self, "_name", module.__name__)
+        object.__setattr__(self, "_attrs", types.MappingProxyType(attrs))
+
+    def __getattr__(self, name: str) -> Any:
+        try:
+            return self._attrs[name]
+        except KeyError:
+            raise AttributeError(f"module '{self._name}' has no attribute '{name}'") from None
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"module '{self._name}' is read-only")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"module '{self._name}' is read-only")
+
+    def __repr__(self) -> str:
+        return f"<module '{self._name}' (read-only)>"
+
+
+# よく使う標準ライブラリを前置提供（import を禁止しているため）。実行間で書き換えられないよう読み取り専用ビューで渡す
+_ENV_BASE: Dict[str, Any] = {
+    "math": _ModuleView(math),
+    "statistics": _ModuleView(statistics),
+    "json": _ModuleView(json),
+    "re": _ModuleView(re),
+}
+
+
+def _as_params(params: Any):
+    # list/tuple はそのまま渡す（sqlite3 はどちらも受け付ける）
+    return params if isinstance(params, (list, tuple)) else (params,)
+
+
+class _ReadOnlyCursor:
+    """ユーザーコードに渡すカーソル。元の Cursor/Connection には触らせない。"""
+
+    __slots__ = ("_cur",)
+
+    def __init__(self, cur: sqlite3.Cursor) -> None:
+        self._cur = cur
+
+    def execute(self, query: str, params: Any = ()) -> "_ReadOnlyCursor":
+        self._cur.execute(query, _as_params(params))
+        return self
+
+    def fetchone(self) -> Any:
+        return self._cur.fetchone()
+
+    def fetchmany(self, size: int = 1) -> List[Any]:
+        return self._cur.fetchmany(size)
+
+    def fetchall(self) -> List[Any]:
+        return self._cur.fetchall()
+
+    def __iter__(self) -> "_ReadOnlyCursor":
+        return self
+
+    def __next__(self) -> Any:
+        return next(self._cur)
+
+    @property
+    def description(self) -> Any:
+        return self._cur.description
+
+
+class _ReadOnlyConnection:
+    """ユーザーコードに渡す conn（execute/cursor のみ）。
+    接続は実行間で使い回すため、create_function/set_authorizer 等で状態を変えられないようにする。"""
+
+    __slots__ = ("_conn",)
+
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        self._conn = conn
+
+    def execute(self, query: str, params: Any = ()) -> _ReadOnlyCursor:
+        return _ReadOnlyCursor(self._conn.execute(query, _as_params(params)))
+
+    def cursor(self) -> _ReadOnlyCursor:
+        return _ReadOnlyCursor(self._conn.cursor())
 
 
-def run_user_code(code: str, db_path: Optional[str] = None, args: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+# ラッパの中身やフレーム経由で元のオブジェクト/グローバルに届く属性
+_FORBIDDEN_ATTRS = frozenset({"gi_frame", "cr_frame", "ag_frame", "tb_frame", "f_back", "f_globals", "f_locals", "f_builtins"})
+
+
+class _SandboxChecker(ast.NodeVisitor):
+    """コンパイル前に禁止構文（import/global/nonlocal/_ で始まる属性/フレーム属性/属性への代入）を弾く。"""
+
+    def visit_Import(self, node: ast.AST) -> None:
+        raise ValueError(f"import is not allowed (line {node.lineno})")
+
+    visit_ImportFrom = visit_Import
+
+    def visit_Global(self, node: ast.AST) -> None:
+        raise ValueError(f"global/nonlocal is not allowed (line {node.lineno})")
+
+    visit_Nonlocal = visit_Global
+
+    def visit_Attribute(self, node: ast.Attribute) -> None:
+        if node.attr.startswith("_") or node.attr in _FORBIDDEN_ATTRS:
+            raise ValueError(f"access to attribute '{node.attr}' is not allowed (line {node.lineno})")
+        if not isinstance(node.ctx, ast.Load):
+            # 属性への代入/削除は共有オブジェクト（json.JSONEncoder 等）の書き換えになるため禁止
+            raise ValueError(f"assignment to attribute '{node.attr}' is not allowed (line {node.lineno})")
+        self.generic_visit(node)
+
+
+# コード本文のダイジェスト -> コンパイル済みコードオブジェクト（LRU, 上限 _CODE_CACHE_MAX）
+_CODE_CACHE_MAX = 128
+_CODE_CACHE: "OrderedDict[bytes, types.CodeType]" = OrderedDict()
+_CODE_CACHE_LOCK = threading.Lock()
+
+
+def _compile(code: str) -> types.CodeType:
+    """同一コードの再実行時に AST 検査/コンパイルを省略するためのキャッシュ。"""
+    key = hashlib.blake2b(code.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+    with _CODE_CACHE_LOCK:
+        code_obj = _CODE_CACHE.get(key)
+        if code_obj is not None:
+            _CODE_CACHE.move_to_end(key)
+            return code_obj
+    tree = ast.parse(code, "<user_code>", "exec")
+    _SandboxChecker().visit(tree)
+    code_obj = compile(tree, "<user_code>", "exec", dont_inherit=True)
+    with _CODE_CACHE_LOCK:
+        _CODE_CACHE[key] = code_obj
+        if len(_CODE_CACHE) > _CODE_CACHE_MAX:
+            _CODE_CACHE.popitem(last=False)
+    return code_obj
+
+
+def run_user_code(
+    code: str,
+    db_path: Optional[str] = None,
+    args: Optional[Dict[str, Any]] = None,
+    conn: Optional[sqlite3.Connection] = None,
+) -> Dict[str, Any]:
     """
     ユーザーコードを安全サンドボックスで実行し、結果と標準出力を返す。
-    - conn は読み取り専用
+    - conn は読み取り専用（未指定時はプロセス内でキャッシュした接続を使う）
     - sql(query, params=()) で list[dict] 取得
+    - sql_iter(query, params=()) で dict を1行ずつ返すイテレータ取得（大きな結果向け）
     - scalar(query, params=()) で単一値取得
     - ユーザーは変数 result に最終結果を代入する（JSON シリアライズ可能な値）
     """
+    code_obj = _compile(code)  # 禁止構文はここで ValueError（接続を取る前に弾く）
     args = args or {}
-    conn = _open_ro_conn(db_path)
+    owned = conn is None
+    if conn is None:
+        conn = _get_ro_conn(db_path)
 
     def sql(query: str, params: Any = ()):
-        cur = conn.execute(query, params if isinstance(params, (list, tuple)) else (params,))
-        return [dict(r) for r in cur.fetchall()]
+        cur = conn.execute(query, _as_params(params))
+        return list(map(dict, cur.fetchall()))
+
+    def sql_iter(query: str, params: Any = ()):
+        # 1行ずつ dict 化して返す（全件を list に溜めない）
+        cur = conn.execute(query, _as_params(params))
+        return (dict(r) for r in cur)
 
     def scalar(query: str, params: Any = ()):
-        cur = conn.execute(query, params if isinstance(params, (list, tuple)) else (params,))
+        cur = conn.execute(query, _as_params(params))
         row = cur.fetchone()
-        return None if row is None else (row[0] if len(row.keys()) == 1 else dict(row))
+        return None if row is None else (row[0] if len(row) == 1 else dict(row))
 
     # 実行環境（globals/locals を同一 dict にすることで関数内からも参照可能にする）
     env: Dict[str, Any] = {
-        "__builtins__": _safe_builtins(),
-        # よく使う標準ライブラリを前置提供（import を禁止しているため）
-        "math": math,
-        "statistics": statistics,
-        "json": json,
-        "re": re,
+        **_ENV_BASE,
+        "__builtins__": _SAFE_BUILTINS,
         # 実行ヘルパ
-        "conn": conn,     # 読み取り専用
+        "conn": _ReadOnlyConnection(conn),  # 読み取り専用（execute/cursor のみ）
         "sql": sql,       # SELECT ヘルパ
+        "sql_iter": sql_iter,  # SELECT ヘルパ（イテレータ版）
         "scalar": scalar, # 単一値ヘルパ
         "args": args,     # ユーザー指定の任意パラメータ
         "result": None,   # 結果の受け渡し用
@@ -101,12 +339,10 @@ def run_user_code(code: str, db_path: Optional[str] = None, args: Optional[Dict[
     stdout_io = io.StringIO()
     try:
         with redirect_stdout(stdout_io):
-            exec(code, env, env)
+            exec(code_obj, env, env)
     finally:
-        try:
-            conn.close()
-        except Exception:
-            pass
+        if owned:
+            _release_ro_conn(db_path, conn)
 
     out = {
         "stdout": stdout_io.getvalue(),
@@ -115,16 +351,122 @@ def run_user_code(code: str, db_path: Optional[str] = None, args: Optional[Dict[
     return out
 
 
-def _worker_run_code(code: str, db_path: Optional[str], args: Optional[Dict[str, Any]], q: Queue) -> None:
-    """Child process worker to safely execute user code and return results via a Queue."""
+# ワーカー -> 親の通知パイプ（initializer で受け取る）。ジョブを開始した時点で job_id を1つ送る。
+# 小さなメッセージは1回の write で送られ、ロックを使わないので、途中でワーカーが落ちても他のワーカーを巻き込まない
+_JOB_EVENTS: Optional[Any] = None
+# 中断済み job_id の共有表（プールごとに1つ）。job_id % _CANCEL_SLOTS の位置に job_id を書く。
+# 親が書き、ワーカーは開始前と実行中に自分の job_id が載っているかを見る
+_CANCEL_SLOTS = 4096
+_CANCELLED: Optional[Any] = None
+# ワーカー側: いまユーザーコードを実行している job_id（0 = 実行していない）
+_CURRENT_JOB = 0
+_CURRENT_JOB_LOCK = threading.Lock()
+_CANCEL_POLL_SEC = 0.05
+
+
+def _is_cancelled(job_id: int) -> bool:
+    return _CANCELLED is not None and _CANCELLED[job_id % _CANCEL_SLOTS] == job_id
+
+
+def _watch_cancellation() -> None:
+    """Worker-side thread: exit the process if the job it is running gets cancelled."""
+    while True:
+        time.sleep(_CANCEL_POLL_SEC)
+        with _CURRENT_JOB_LOCK:
+            # ロック中は _CURRENT_JOB が変わらないので、次のジョブやプール内部の処理中に落ちることはない
+            if _CURRENT_JOB and _is_cancelled(_CURRENT_JOB):
+                os._exit(1)
+
+
+def _init_worker(job_events: Any, cancelled: Any) -> None:
+    """Pool initializer. Runs once per worker process, not once per job."""
+    global _JOB_EVENTS, _CANCELLED
+    _JOB_EVENTS = job_events
+    _CANCELLED = cancelled
+    # Ctrl+C は親プロセス側で処理する（ワーカーのトレースバック出力を抑止）
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    threading.Thread(target=_watch_cancellation, daemon=True).start()
+    # 既定 DB の接続を先に開いておく（失敗時は初回実行時に改めてエラーになる）
+    try:
+        _get_ro_conn(None)
+    except Exception:
+        pass
+
+
+def _worker_run_code_payload(
+    job_id: int, code: str, db_path: Optional[str], args: Optional[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """Pool task: execute user code and return the result envelope through the pool's pipe."""
+    global _CURRENT_JOB
+    if _is_cancelled(job_id):
+        # 待ち行列にいる間に呼び出し側が諦めたジョブは実行しない
+        return {"ok": False, "error": "cancelled"}
+    _JOB_EVENTS.send(job_id)
+    with _CURRENT_JOB_LOCK:
+        _CURRENT_JOB = job_id
     try:
         out = run_user_code(code=code, db_path=db_path, args=args or {})
         # Cap stdout length to avoid excessive payloads
         if isinstance(out, dict) and "stdout" in out and isinstance(out["stdout"], str):
             out["stdout"] = out["stdout"][:10000]
-        q.put({"ok": True, "data": out})
+        return {"ok": True, "data": out}
     except Exception as e:
-        q.put({"ok": False, "error": str(e)})
+        return {"ok": False, "error": str(e)}
+    finally:
+        with _CURRENT_JOB_LOCK:
+            _CURRENT_JOB = 0
+
+
+# 親側: job_id -> 開始通知（ワーカーがジョブを取り出したら set）
+_JOB_IDS = itertools.count(1)
+_JOBS_LOCK = threading.Lock()
+_JOB_STARTED: Dict[int, threading.Event] = {}
+
+
+def _watch_job_events(job_events: Any) -> None:
+    """Parent-side thread: mark jobs as started when a worker picks them up."""
+    while True:
+        try:
+            job_id = job_events.recv()
+        except (EOFError, OSError):
+            return
+        with _JOBS_LOCK:
+            started = _JOB_STARTED.get(job_id)
+        if started is not None:
+            started.set()
+
+
+def _cancel_job(cancelled: Any, job_id: int) -> None:
+    """Cancel job_id only: skipped if still queued, its worker exits if already running."""
+    cancelled[job_id % _CANCEL_SLOTS] = job_id
+
+
+def _get_pool() -> Tuple[Pool, Any]:
+    """Return the long-lived worker pool and its cancellation table, creating them on first use."""
+    global _POOL, _CANCELLED
+    with _POOL_LOCK:
+        if _POOL is None:
+            events_r, events_w = _MP_CTX.Pipe(duplex=False)
+            _CANCELLED = _MP_CTX.RawArray("q", _CANCEL_SLOTS)
+            _POOL = _MP_CTX.Pool(processes=POOL_SIZE, initializer=_init_worker, initargs=(events_w, _CANCELLED))
+            threading.Thread(target=_watch_job_events, args=(events_r,), daemon=True).start()
+        return _POOL, _CANCELLED
+
+
+def _forget_pool(pool: Pool) -> None:
+    """Drop a pool that is no longer running; the next call creates a fresh one."""
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is pool:
+            _POOL = None
+
+
+@atexit.register
+def _shutdown_pool() -> None:
+    with _POOL_LOCK:
+        pool = _POOL
+    if pool is not None:
+        pool.terminate()
 
 
 def run_user_code_with_timeout(
@@ -134,20 +476,39 @@ def run_user_code_with_timeout(
     timeout_sec: float = 8.0,
 ) -> Dict[str, Any]:
     """
-    Execute user code in a separate process with a timeout (Windows-safe).
+    Execute user code in a persistent worker pool with a timeout (Windows-safe).
     Returns {result, stdout} or {error}.
     """
-    q: Queue = multiprocessing.Queue()
-    p: Process = multiprocessing.Process(target=_worker_run_code, args=(code, db_path, args, q))
-    p.start()
-    p.join(timeout_sec)
-    if p.is_alive():
-        p.terminate()
-        p.join(1)
+    job_id = next(_JOB_IDS)
+    started = threading.Event()
+    with _JOBS_LOCK:
+        _JOB_STARTED[job_id] = started
+    try:
+        for attempt in range(2):
+            pool, cancelled = _get_pool()
+            try:
+                pending = pool.apply_async(_worker_run_code_payload, (job_id, code, db_path, args))
+                break
+            except ValueError:
+                # "Pool not running": 終了済みのプールを掴んだ場合は作り直して1回だけ再試行
+                _forget_pool(pool)
+                if attempt:
+                    raise
+        # 空きワーカー待ちは timeout_sec に含めない（他の呼び出しが詰まっていても自分の持ち時間は減らない）
+        if not started.wait(QUEUE_TIMEOUT_SEC) and not pending.ready():
+            _cancel_job(cancelled, job_id)
+            return {"result": None, "stdout": "", "error": f"busy: no worker became free within {QUEUE_TIMEOUT_SEC}s"}
+        msg = pending.get(timeout_sec)
+    except multiprocessing.TimeoutError:
+        # このジョブだけを止める（他の呼び出しのジョブは続行）
+        _cancel_job(cancelled, job_id)
         return {"result": None, "stdout": "", "error": f"timeout after {timeout_sec}s"}
-    if q.empty():
-        return {"result": None, "stdout": "", "error": "no result (crash or empty output)"}
-    msg = q.get()
+    except Exception as e:
+        # result が pickle できない場合など
+        return {"result": None, "stdout": "", "error": str(e)}
+    finally:
+        with _JOBS_LOCK:
+            _JOB_STARTED.pop(job_id, None)
     if not isinstance(msg, dict) or not msg.get("ok"):
         return {"result": None, "stdout": "", "error": str(msg.get("error", "unknown error"))}
     return msg["data"]
@@ -157,7 +518,8 @@ if __name__ == "__main__":
     # デモ: 「ソーラービーム」を覚える くさ タイプ かつ とくこう >= 100 のポケモンを検索
     demo_code = r'''
 # 列名の差異（sp_attack/sp_atk/spa）に対応
-cols = [r["name"] for r in sql("PRAGMA table_info(pokemons)")]
+# table_xinfo は生成列（type1/type2）も含む
+cols = [r["name"] for r in sql("PRAGMA table_xinfo(pokemons)")]
 def pick(*cands):
     for c in cands:
         if c in cols:
@@ -168,19 +530,25 @@ spa_col = pick("sp_attack", "sp_atk", "spa")
 if spa_col is None:
     raise ValueError("とくこう列が見つかりません（sp_attack/sp_atk/spa のいずれかが必要）")
 
+# 索引付きの type1/type2 列があれば使い、無ければ types_json の LIKE
+if "type1" in cols:
+    type_cond, type_params = "(p.type1 = ? OR p.type2 = ?)", ["くさ", "くさ"]
+else:
+    type_cond, type_params = "p.types_json LIKE ?", ['%"くさ"%']
+
 query = f"""
 SELECT p.*
 FROM pokemons p
 JOIN pokemon_moves pm ON pm.pokemon_id = p.id
 JOIN moves m ON m.id = pm.move_id
 WHERE m.name = ?
-  AND p.types_json LIKE ?
+  AND {type_cond}
   AND p.{spa_col} >= ?
 GROUP BY p.id
 ORDER BY p.{spa_col} DESC, p.name ASC
 """
 
-rows = sql(query, ["ソーラービーム", '%"くさ"%', 100])
+rows = sql(query, ["ソーラービーム", *type_params, 100])
 result = [r["name"] for r in rows]
 print(f"hit={len(rows)}")
 '''
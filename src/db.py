@@ -1,22 +1,100 @@
 from __future__ import annotations
 
 import os
+import queue
 import sqlite3
-from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
 
 DEFAULT_DB_PATH = os.environ.get(
     "ZA_DB",
     os.path.join(os.path.dirname(os.path.dirname(__file__)), "za.sqlite3"),
 )
 
+# sqlite3 の prepared statement キャッシュ（既定 128）。検索系は SQL の形が多いため広げる
+STATEMENT_CACHE_SIZE = 256
+
+# ZA_DB_IMMUTABLE=1: サーバ稼働中に DB を書き換えない（スクレイパを走らせない）配布用途向け。
+# 読み取り接続を immutable=1 で開き、SELECT ごとのロック取得/変更検知を省く。
+# WAL に未チェックポイントの内容があると読まれないため、書き込み後は checkpoint 済みであること
+DB_IMMUTABLE = os.environ.get("ZA_DB_IMMUTABLE", "0") == "1"
+
+
+def readonly_uri(path: str) -> str:
+    uri = f"file:{path}?mode=ro"
+    return uri + "&immutable=1" if DB_IMMUTABLE else uri
+
+
+def configure_writer(conn: sqlite3.Connection) -> None:
+    # journal_mode は DB ファイルに永続化されるため、書き込み側（スクレイパ）でのみ切り替える
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+
+
+# 読み取り接続の mmap 上限（API のプール接続と run_code サンドボックスで共通）。DB は数 MB なので全体が収まる
+READER_MMAP_SIZE = 256 * 1024 * 1024
+
+
+def configure_reader(conn: sqlite3.Connection) -> None:
+    conn.execute(f"PRAGMA mmap_size={READER_MMAP_SIZE}")
+    conn.execute("PRAGMA cache_size=-65536")
+    conn.execute("PRAGMA temp_store=MEMORY")
+
 
 def get_connection(db_path: Optional[str] = None) -> sqlite3.Connection:
     path = db_path or DEFAULT_DB_PATH
-    conn = sqlite3.connect(path)
+    conn = sqlite3.connect(path, cached_statements=STATEMENT_CACHE_SIZE)
+    conn.row_factory = sqlite3.Row
+    configure_reader(conn)
+    return conn
+
+
+# -----------------------------
+# Connection pool: idle connections per (db_path, readonly), reused LIFO so the warmest one goes out first
+# -----------------------------
+POOL_MAX_IDLE = 8
+
+_POOL: Dict[Tuple[str, bool], "queue.LifoQueue[sqlite3.Connection]"] = {}
+_POOL_LOCK = threading.Lock()
+
+
+def _open_pooled(path: str, readonly: bool) -> sqlite3.Connection:
+    if readonly:
+        conn = sqlite3.connect(
+            readonly_uri(path), uri=True, check_same_thread=False, cached_statements=STATEMENT_CACHE_SIZE
+        )
+        conn.execute("PRAGMA query_only=ON")
+    else:
+        conn = sqlite3.connect(path, check_same_thread=False, cached_statements=STATEMENT_CACHE_SIZE)
+        configure_writer(conn)
     conn.row_factory = sqlite3.Row
+    configure_reader(conn)
     return conn
 
 
+@contextmanager
+def borrow_conn(db_path: Optional[str] = None, readonly: bool = True) -> Iterator[sqlite3.Connection]:
+    key = (db_path or DEFAULT_DB_PATH, readonly)
+    with _POOL_LOCK:
+        idle = _POOL.setdefault(key, queue.LifoQueue(maxsize=POOL_MAX_IDLE))
+    try:
+        conn = idle.get_nowait()
+    except queue.Empty:
+        conn = _open_pooled(*key)
+    try:
+        yield conn
+    finally:
+        # 未コミットの変更は破棄してから返却する（書き込み側は with 内で commit すること）
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            idle.put_nowait(conn)
+        except (sqlite3.Error, queue.Full):
+            conn.close()
+
+
 def detect_json1_enabled(conn: sqlite3.Connection) -> bool:
     try:
         conn.execute("SELECT json(?)", ("[]",)).fetchone()
@@ -31,17 +109,28 @@ def detect_json1_enabled(conn: sqlite3.Connection) -> bool:
 
 
 def get_table_columns(conn: sqlite3.Connection, table: str) -> Set[str]:
-    cur = conn.execute(f"PRAGMA table_info({table})")
+    # table_xinfo: generated columns (e.g. pokemons.type1/type2) are hidden from table_info
+    cur = conn.execute(f"PRAGMA table_xinfo({table})")
     return {str(row[1]) for row in cur.fetchall()}
 
 
+def get_table_column_list(conn: sqlite3.Connection, table: str) -> List[str]:
+    # get_table_columns の順序保持版（cid 順）
+    cur = conn.execute(f"PRAGMA table_xinfo({table})")
+    return [str(row[1]) for row in cur.fetchall()]
+
+
 def rows_to_dicts(rows: Iterable[sqlite3.Row]) -> List[Dict[str, Any]]:
     return [dict(row) for row in rows]
 
 
+@lru_cache(maxsize=1024)  # 補完入力など同じ語の繰り返しが多い
 def build_like(term: Optional[str]) -> Optional[str]:
     if term is None:
         return None
+    # 末尾が % なら呼び出し側指定のパターンとしてそのまま使う（'フシ%' は前方一致で索引が効く）
+    if term.endswith("%"):
+        return term
     return f"%{term}%"
 
 
@@ -54,6 +143,19 @@ def execute_query(
     return rows_to_dicts(cur.fetchall())
 
 
+def execute_query_columnar(
+    conn: sqlite3.Connection,
+    sql: str,
+    params: Sequence[Any] | None = None,
+) -> Tuple[List[str], List[Tuple[Any, ...]]]:
+    # 行を dict/Row にせず素の tuple で返す（列名は description から1回だけ取る）
+    cur = conn.cursor()
+    cur.row_factory = None
+    cur.execute(sql, tuple(params or []))
+    rows = cur.fetchall()
+    return [d[0] for d in cur.description], rows
+
+
 def execute_one(
     conn: sqlite3.Connection,
     sql: str,
@@ -11,18 +11,35 @@ Usage:
 from __future__ import annotations
 
 import argparse
+import json
+import re
 import sqlite3
 import sys
+import threading
 import time
-from typing import Dict, List, Optional, Tuple, Set
+from functools import lru_cache, partial
+from multiprocessing.pool import ThreadPool
+from typing import Dict, FrozenSet, List, Optional, Tuple, Set
 
 try:
     import cloudscraper  # type: ignore
 except Exception as e:
     cloudscraper = None  # type: ignore
 
+try:
+    # Optional: plain keep-alive (HTTP/2 when h2 is installed) client for pages Cloudflare does not challenge
+    import httpx  # type: ignore
+except Exception:
+    httpx = None  # type: ignore
+
 from bs4 import BeautifulSoup, UnicodeDammit
 
+try:
+    import lxml  # type: ignore  # noqa: F401
+    SOUP_FEATURES = "lxml"
+except Exception:
+    SOUP_FEATURES = "html.parser"
+
 # Reuse everything from the existing scraper
 from src.scrape_za import (
     POKEMON_BASE,
@@ -36,6 +53,63 @@ from src.scrape_za import (
     upsert_move,
     upsert_pokemon_move,
 )
+from src.db import STATEMENT_CACHE_SIZE, configure_writer, detect_json1_enabled
+
+BROWSER_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/124.0.0.0 Safari/537.36"
+    ),
+    "Accept-Language": "ja-JP,ja;q=0.9,en;q=0.8",
+    "Referer": POKEMON_BASE,
+}
+
+# Move-detail updates are written (executemany + commit) in batches of this size
+MOVE_COMMIT_EVERY = 100
+
+_CF_CHALLENGE = re.compile(rb"__cf_chl_|cf-browser-verification").search
+_HAS_TABLE = re.compile(r"<table\b", re.I).search
+_META_CHARSET = re.compile(rb'<meta[^>]+charset=["\']?([\w\-]+)', re.I)
+
+
+class RateLimiter:
+    """Start at most one request per `delay` seconds across all workers (the old sequential loop's budget),
+    with up to `concurrency` requests in flight so slow responses overlap instead of stacking up.
+    """
+
+    def __init__(self, concurrency: int, delay: float) -> None:
+        self._slots = threading.Semaphore(concurrency)
+        self._delay = delay
+        self._lock = threading.Lock()
+        self._next_start = 0.0
+
+    def _wait_turn(self) -> None:
+        # 開始時刻を delay 間隔で順番に予約する（ワーカー数を増やしてもリクエスト頻度は上がらない）
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_start)
+            self._next_start = start + self._delay
+        if start > now:
+            time.sleep(start - now)
+
+    def call(self, fn, *args):
+        with self._slots:
+            self._wait_turn()
+            return fn(*args)
+
+
+def fetch_safely(limiter: RateLimiter, fn, session, key):
+    """Pool task wrapper: return (key, result, error) so one failed page does not abort the whole map."""
+    try:
+        return key, limiter.call(fn, session, key), None
+    except Exception as e:
+        return key, None, e
+
+
+def map_chunksize(n_items: int, workers: int) -> int:
+    """Chunk size for Pool.imap*: a few chunks per worker instead of one round-trip per item."""
+    return max(1, n_items // (workers + 2))
 
 
 def merge_move_duplicates_by_name(conn: sqlite3.Connection, canonical_move_id: int, name: str) -> None:
@@ -66,15 +140,8 @@ def merge_move_duplicates_by_name(conn: sqlite3.Connection, canonical_move_id: i
     conn.commit()
 
 
-def update_move_record_cloud(conn: sqlite3.Connection, move_id: int, data: Dict) -> None:
-    """Safe move update that resolves name-uniqueness conflicts by merging duplicates first."""
-    cur = conn.cursor()
-
-    # Discover existing columns to avoid OperationalError against older DBs
-    cur.execute("PRAGMA table_info(moves)")
-    existing_cols = {row[1] for row in cur.fetchall()}
-
-    # Normalize incoming keys to match DB columns
+def normalize_move_data(data: Dict) -> Dict[str, Optional[str]]:
+    """Map scraped move-detail keys (including legacy aliases) onto the normalized keys used for updates."""
     normalized: Dict[str, Optional[str]] = {}
     normalized["name"] = data.get("name")
     normalized["type"] = data.get("type")
@@ -113,53 +180,76 @@ def update_move_record_cloud(conn: sqlite3.Connection, move_id: int, data: Dict)
     if normalized.get("total_time_plus") is None:
         normalized["total_time_plus"] = normalized.get("total_time")
 
-    # Map incoming data keys to column names
-    mapping = [
-        ("name", "name"),
-        ("type", "type"),
-        ("category", "category"),
-        ("power", "power"),
-        ("activation_time", "activation_time"),
-        ("startup_time", "startup_time"),
-        ("startup_time_q", "startup_time_q"),
-        # legacy alias for quickclaw
-        ("startup_time_q", "startup_time_quickclaw"),
-        ("startup_time_plus", "startup_time_plus"),
-        ("recovery_time", "recovery_time"),
-        ("total_time", "total_time"),
-        ("total_time_plus", "total_time_plus"),
-        ("dps", "dps"),
-        ("direct_attack", "direct_attack"),
-        # legacy alias for contact
-        ("direct_attack", "contact"),
-        ("finger_wag", "finger_wag"),
-        # legacy alias for finger
-        ("finger_wag", "finger"),
-        ("protect", "protect"),
-        ("substitute", "substitute"),
-        ("range_", "range_"),
-        # legacy alias for range
-        ("range_", "range"),
-        ("effect", "effect"),
-        ("page_url", "page_url"),
-    ]
-
+    return normalized
+
+
+# Map normalized data keys to moves column names (legacy aliases are updated too)
+MOVE_UPDATE_MAPPING: List[Tuple[str, str]] = [
+    ("name", "name"),
+    ("type", "type"),
+    ("category", "category"),
+    ("power", "power"),
+    ("activation_time", "activation_time"),
+    ("startup_time", "startup_time"),
+    ("startup_time_q", "startup_time_q"),
+    # legacy alias for quickclaw
+    ("startup_time_q", "startup_time_quickclaw"),
+    ("startup_time_plus", "startup_time_plus"),
+    ("recovery_time", "recovery_time"),
+    ("total_time", "total_time"),
+    ("total_time_plus", "total_time_plus"),
+    ("dps", "dps"),
+    ("direct_attack", "direct_attack"),
+    # legacy alias for contact
+    ("direct_attack", "contact"),
+    ("finger_wag", "finger_wag"),
+    # legacy alias for finger
+    ("finger_wag", "finger"),
+    ("protect", "protect"),
+    ("substitute", "substitute"),
+    ("range_", "range_"),
+    # legacy alias for range
+    ("range_", "range"),
+    ("effect", "effect"),
+    ("page_url", "page_url"),
+]
+
+
+@lru_cache(maxsize=8)
+def build_move_update(existing_cols: FrozenSet[str]) -> Tuple[Optional[str], Tuple[str, ...]]:
+    """UPDATE statement and parameter key order for the moves columns present in this DB (cached per column set)."""
     set_parts = []
-    values: list = []
-    for key, col in mapping:
+    keys: List[str] = []
+    for key, col in MOVE_UPDATE_MAPPING:
         if col in existing_cols:
             set_parts.append(f"{col}=?")
-            values.append(normalized.get(key))
-
+            keys.append(key)
     if not set_parts:
+        return None, tuple(keys)
+    return f"UPDATE moves SET {', '.join(set_parts)} WHERE id=?", tuple(keys)
+
+
+def update_move_record_cloud(
+    conn: sqlite3.Connection,
+    move_id: int,
+    data: Dict,
+    existing_cols: FrozenSet[str],
+) -> None:
+    """Safe move update that resolves name-uniqueness conflicts by merging duplicates first.
+    existing_cols is the moves column set read once per run (see get_moves_columns), so older DBs
+    never see an UPDATE of a missing column. The caller is responsible for committing.
+    """
+    cur = conn.cursor()
+    sql, keys = build_move_update(existing_cols)
+    if sql is None:
         return  # nothing to update
 
+    normalized = normalize_move_data(data)
+    values = [normalized.get(k) for k in keys]
     values.append(move_id)
-    sql = f"UPDATE moves SET {', '.join(set_parts)} WHERE id=?"
 
     def do_update() -> None:
         cur.execute(sql, tuple(values))
-        conn.commit()
 
     try:
         do_update()
@@ -171,6 +261,38 @@ def update_move_record_cloud(conn: sqlite3.Connection, move_id: int, data: Dict)
         do_update()
 
 
+def apply_move_updates(
+    conn: sqlite3.Connection,
+    updates: List[Tuple[int, Dict]],
+    existing_cols: FrozenSet[str],
+) -> None:
+    """Write a batch of (move_id, detail) updates with one executemany in one transaction.
+    If any row violates name uniqueness the batch is rolled back and replayed row by row,
+    letting update_move_record_cloud merge the duplicates.
+    """
+    if not updates:
+        return
+    sql, keys = build_move_update(existing_cols)
+    if sql is None:
+        return
+    rows = []
+    for move_id, data in updates:
+        normalized = normalize_move_data(data)
+        rows.append(tuple([normalized.get(k) for k in keys] + [move_id]))
+    try:
+        with conn:
+            conn.executemany(sql, rows)
+    except sqlite3.IntegrityError:
+        for move_id, data in updates:
+            update_move_record_cloud(conn, move_id, data, existing_cols)
+        conn.commit()
+
+
+def get_moves_columns(conn: sqlite3.Connection) -> FrozenSet[str]:
+    """Column names of 'moves'; read once per run after migrate_moves_schema (the schema is fixed from then on)."""
+    return frozenset(row[1] for row in conn.execute("PRAGMA table_info(moves)").fetchall())
+
+
 def migrate_moves_schema(conn: sqlite3.Connection) -> None:
     """Ensure the 'moves' table has all expected columns; add missing ones if needed."""
     cur = conn.cursor()
@@ -206,6 +328,113 @@ def migrate_moves_schema(conn: sqlite3.Connection) -> None:
             cur.execute(f"ALTER TABLE moves ADD COLUMN {col} {coltype}")
     conn.commit()
 
+
+def migrate_moves_indexes(conn: sqlite3.Connection) -> None:
+    """Index the search_moves filters: type/category equality + dps range/sort, and NOCASE name for 'foo%' LIKE."""
+    cur = conn.cursor()
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_moves_type_dps ON moves(type, dps)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_moves_category_dps ON moves(category, dps)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_moves_dps ON moves(dps)")
+    # LIKE is case-insensitive by default, so only a NOCASE index qualifies for the prefix-LIKE optimization
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_moves_name_nocase ON moves(name COLLATE NOCASE)")
+    conn.commit()
+
+
+def migrate_pokemons_schema(conn: sqlite3.Connection) -> bool:
+    """Add indexed type1/type2 columns (1st/2nd element of types_json) so type filters can seek instead of LIKE-scan.
+    With JSON1 they are VIRTUAL generated columns (SQLite cannot ADD a STORED one); otherwise plain columns
+    that refresh_pokemon_type_columns() fills. Returns True when SQLite maintains them itself.
+    """
+    cur = conn.cursor()
+    # table_xinfo also lists generated columns, which table_info hides
+    cur.execute("PRAGMA table_xinfo(pokemons)")
+    existing = {row[1]: row[6] for row in cur.fetchall()}  # name -> hidden (2/3 = generated)
+
+    if "type1" not in existing:
+        if detect_json1_enabled(conn):
+            for col, idx in (("type1", 0), ("type2", 1)):
+                cur.execute(
+                    f"ALTER TABLE pokemons ADD COLUMN {col} TEXT "
+                    f"GENERATED ALWAYS AS (json_extract(types_json, '$[{idx}]')) VIRTUAL"
+                )
+            existing["type1"] = 2
+        else:
+            cur.execute("ALTER TABLE pokemons ADD COLUMN type1 TEXT")
+            cur.execute("ALTER TABLE pokemons ADD COLUMN type2 TEXT")
+            existing["type1"] = 0
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_pokemons_type1 ON pokemons(type1)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_pokemons_type2 ON pokemons(type2)")
+    conn.commit()
+    return existing["type1"] in (2, 3)
+
+
+def refresh_pokemon_type_columns(conn: sqlite3.Connection) -> None:
+    """Fill plain type1/type2 columns from types_json (only needed when they are not generated columns)."""
+    rows = []
+    for pid, types_json in conn.execute("SELECT id, types_json FROM pokemons").fetchall():
+        try:
+            types = json.loads(types_json or "[]")
+        except ValueError:
+            types = []
+        rows.append((types[0] if len(types) > 0 else None, types[1] if len(types) > 1 else None, pid))
+    with conn:
+        conn.executemany("UPDATE pokemons SET type1=?, type2=? WHERE id=?", rows)
+
+
+def migrate_pokemon_types_schema(conn: sqlite3.Connection) -> None:
+    """Create the normalized pokemon_types(pokemon_id, type) table the search API joins for type filters,
+    so they no longer need JSON1 or a LIKE scan over types_json. Filled by refresh_pokemon_types().
+    """
+    cur = conn.cursor()
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS pokemon_types (
+            pokemon_id INTEGER NOT NULL,
+            type TEXT NOT NULL,
+            PRIMARY KEY (pokemon_id, type)
+        ) WITHOUT ROWID
+        """
+    )
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_pt_type ON pokemon_types(type)")
+    conn.commit()
+
+
+def refresh_pokemon_types(conn: sqlite3.Connection) -> None:
+    """Rebuild pokemon_types from pokemons.types_json (parsed in Python, so JSON1 is not required)."""
+    rows = []
+    for pid, types_json in conn.execute("SELECT id, types_json FROM pokemons").fetchall():
+        try:
+            types = json.loads(types_json or "[]")
+        except ValueError:
+            types = []
+        rows.extend((pid, t) for t in types if t)
+    with conn:
+        conn.execute("DELETE FROM pokemon_types")
+        conn.executemany("INSERT OR IGNORE INTO pokemon_types(pokemon_id, type) VALUES (?, ?)", rows)
+
+
+# Common search sort keys: the first existing column of each group gets an (col, id) index
+SORT_INDEX_CANDIDATES: Tuple[Tuple[str, Tuple[str, ...]], ...] = (
+    ("pokemons", ("bst", "total", "sum")),
+    ("pokemons", ("speed", "spe")),
+    ("pokemons", ("name",)),
+)
+
+
+def migrate_sort_indexes(conn: sqlite3.Connection) -> None:
+    """Index the common search sort keys as (col, id) so keyset pages (ORDER BY col, id) can walk an index."""
+    cur = conn.cursor()
+    cols_by_table: Dict[str, Set[str]] = {}
+    for table, candidates in SORT_INDEX_CANDIDATES:
+        if table not in cols_by_table:
+            cur.execute(f"PRAGMA table_xinfo({table})")
+            cols_by_table[table] = {row[1] for row in cur.fetchall()}
+        col = next((c for c in candidates if c in cols_by_table[table]), None)
+        if col:
+            cur.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_{col}_id ON {table}({col}, id)")
+    conn.commit()
+
+
 def get_cloudscraper_session():
     if cloudscraper is None:
         raise RuntimeError("cloudscraper is not installed. Run: uv pip install cloudscraper")
@@ -218,26 +447,93 @@ def get_cloudscraper_session():
         }
     )
     # Friendly headers
-    sess.headers.update({
-        "User-Agent": (
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-            "AppleWebKit/537.36 (KHTML, like Gecko) "
-            "Chrome/124.0.0.0 Safari/537.36"
-        ),
-        "Accept-Language": "ja-JP,ja;q=0.9,en;q=0.8",
-        "Referer": POKEMON_BASE,
-    })
+    sess.headers.update(BROWSER_HEADERS)
     return sess
 
 
-def cloud_fetch_html(session, url: str) -> str:
-    resp = session.get(url, timeout=30, allow_redirects=True)
+_HTTPX_CLIENT = None
+_HTTPX_LOCK = threading.Lock()
+_HTTPX_CHALLENGED = False
+
+
+def get_httpx_client():
+    """Shared httpx client, or None when httpx is missing or Cloudflare has already challenged it."""
+    global _HTTPX_CLIENT
+    if httpx is None or _HTTPX_CHALLENGED:
+        return None
+    with _HTTPX_LOCK:
+        if _HTTPX_CLIENT is None:
+            try:
+                import h2  # type: ignore  # noqa: F401
+                http2 = True
+            except Exception:
+                http2 = False
+            _HTTPX_CLIENT = httpx.Client(
+                http2=http2,
+                headers=BROWSER_HEADERS,
+                timeout=30,
+                follow_redirects=True,
+                limits=httpx.Limits(max_keepalive_connections=8),
+            )
+        return _HTTPX_CLIENT
+
+
+def decode_html(data: bytes, declared_encoding: Optional[str] = None) -> str:
+    """Decode with the declared charset (HTTP header, else <meta> in the first 2KB).
+    UnicodeDammit's encoding sniffing is only used when nothing is declared or the declaration is wrong.
+    """
+    enc = declared_encoding
+    # requests assumes ISO-8859-1 for text/* without a charset parameter; that is not a real declaration
+    if enc and enc.lower() in ("iso-8859-1", "latin-1"):
+        enc = None
+    if not enc:
+        m = _META_CHARSET.search(data, 0, 2048)
+        if m:
+            enc = m.group(1).decode("ascii")
+    if enc:
+        try:
+            return data.decode(enc)
+        except (LookupError, UnicodeDecodeError):
+            pass
     # Robust decode using bs4.UnicodeDammit to avoid mojibake across UTF-8/EUC-JP/SJIS
-    data = resp.content
     ud = UnicodeDammit(data, is_html=True)
     return ud.unicode_markup or data.decode("utf-8", errors="ignore")
 
 
+def cloud_fetch_html(session, url: str) -> str:
+    """Fetch via the plain httpx client first; fall back to cloudscraper when Cloudflare challenges.
+    After the first challenge the rest of the run goes straight to cloudscraper.
+    """
+    global _HTTPX_CHALLENGED
+    client = get_httpx_client()
+    if client is not None:
+        try:
+            resp = client.get(url)
+            if resp.status_code not in (403, 503) and not _CF_CHALLENGE(resp.content):
+                return decode_html(resp.content, resp.charset_encoding)
+            _HTTPX_CHALLENGED = True
+        except httpx.HTTPError:
+            pass
+    resp = session.get(url, timeout=30, allow_redirects=True)
+    return decode_html(resp.content, resp.encoding)
+
+
+def make_soup(html: str) -> BeautifulSoup:
+    """Single construction point for the parse trees handed to the shared parsers.
+    The parsers consume the bs4 API, so bs4 stays; lxml is the fastest tree builder it offers.
+    """
+    return BeautifulSoup(html, SOUP_FEATURES)
+
+
+def parse_move_detail(html: str) -> Dict:
+    """Parse a move detail page. Move data lives in the 技データ / effect tables, so a page with no
+    <table> at all (interstitials, error pages) is rejected without building a parse tree.
+    """
+    if not _HAS_TABLE(html):
+        return {}
+    return parse_move_detail_from_html(make_soup(html))
+
+
 def fetch_html_with_playwright_cloud(url: str) -> Optional[str]:
     """Fallback HTML fetch using Playwright for move detail pages."""
     try:
@@ -278,14 +574,14 @@ def fetch_html_with_playwright_cloud(url: str) -> Optional[str]:
 def scrape_pokemon_moves_cloud(session, url: str) -> List[Dict]:
     # Try as-is
     html = cloud_fetch_html(session, url)
-    soup = BeautifulSoup(html, "lxml")
+    soup = make_soup(html)
     moves = parse_pokemon_moves_from_soup(soup)
     if moves:
         return moves
     # Try view=pc variant
     url_pc = url + ("&view=pc" if "?" in url else "?view=pc")
     html = cloud_fetch_html(session, url_pc)
-    soup = BeautifulSoup(html, "lxml")
+    soup = make_soup(html)
     moves = parse_pokemon_moves_from_soup(soup)
     return moves
 
@@ -293,8 +589,7 @@ def scrape_pokemon_moves_cloud(session, url: str) -> List[Dict]:
 def scrape_move_detail_cloud(session, move_key: int) -> Dict:
     url = f"{MOVE_SEARCH_BASE}{move_key}"
     html = cloud_fetch_html(session, url)
-    soup = BeautifulSoup(html, "lxml")
-    data = parse_move_detail_from_html(soup)
+    data = parse_move_detail(html)
     # If critical fields missing, try view=pc
     critical_missing = not data or any(
         data.get(k) in (None, "", "-")
@@ -304,8 +599,7 @@ def scrape_move_detail_cloud(session, move_key: int) -> Dict:
         # try view=pc
         url_pc = url + "&view=pc"
         html = cloud_fetch_html(session, url_pc)
-        soup = BeautifulSoup(html, "lxml")
-        data = parse_move_detail_from_html(soup)
+        data = parse_move_detail(html)
         critical_missing = not data or any(
             data.get(k) in (None, "", "-")
             for k in ("type", "category", "power", "activation_time", "range_", "direct_attack", "finger_wag", "protect", "substitute")
@@ -322,8 +616,7 @@ def scrape_move_detail_cloud(session, move_key: int) -> Dict:
             if html:
                 url = url_pc
         if html:
-            soup = BeautifulSoup(html, "lxml")
-            data = parse_move_detail_from_html(soup)
+            data = parse_move_detail(html)
 
     data["page_url"] = url
     data["move_key"] = move_key
@@ -332,8 +625,7 @@ def scrape_move_detail_cloud(session, move_key: int) -> Dict:
 
 def scrape_move_detail_by_url_cloud(session, url: str) -> Dict:
     html = cloud_fetch_html(session, url)
-    soup = BeautifulSoup(html, "lxml")
-    data = parse_move_detail_from_html(soup)
+    data = parse_move_detail(html)
     critical_missing = not data or any(
         data.get(k) in (None, "", "-")
         for k in ("type", "category", "power", "activation_time", "range_", "direct_attack", "finger_wag", "protect", "substitute")
@@ -342,8 +634,7 @@ def scrape_move_detail_by_url_cloud(session, url: str) -> Dict:
         if "view=pc" not in url:
             url_pc = url + ("&view=pc" if "?" in url else "?view=pc")
             html = cloud_fetch_html(session, url_pc)
-            soup = BeautifulSoup(html, "lxml")
-            data = parse_move_detail_from_html(soup)
+            data = parse_move_detail(html)
             critical_missing = not data or any(
                 data.get(k) in (None, "", "-")
                 for k in ("type", "category", "power", "activation_time", "range_", "direct_attack", "finger_wag", "protect", "substitute")
@@ -359,8 +650,7 @@ def scrape_move_detail_by_url_cloud(session, url: str) -> Dict:
             if html:
                 url = url_pc
         if html:
-            soup = BeautifulSoup(html, "lxml")
-            data = parse_move_detail_from_html(soup)
+            data = parse_move_detail(html)
     data["page_url"] = url
     data["move_key"] = None
     return data
@@ -370,10 +660,15 @@ def run(args) -> None:
     session = get_cloudscraper_session()
 
     # Prepare DB
-    conn = sqlite3.connect(args.db)
+    conn = sqlite3.connect(args.db, cached_statements=STATEMENT_CACHE_SIZE)
+    configure_writer(conn)
     init_db(conn)
     # Make sure legacy DBs have the latest columns to receive move details
     migrate_moves_schema(conn)
+    migrate_moves_indexes(conn)
+    type_cols_generated = migrate_pokemons_schema(conn)
+    migrate_pokemon_types_schema(conn)
+    migrate_sort_indexes(conn)
 
     # Parse list page (local file path)
     pokemons = parse_lists_html(args.lists)
@@ -386,51 +681,22 @@ def run(args) -> None:
     for p in pokemons:
         pid = upsert_pokemon(conn, p)  # assumes scrape_za.upsert_pokemon signature accepts dict
         slug_to_id[p["slug"]] = pid
+    if not type_cols_generated:
+        refresh_pokemon_type_columns(conn)
+    refresh_pokemon_types(conn)
 
     seen_move_keys: Set[int] = set()
     seen_move_urls: Set[str] = set()
 
-    # Learnsets
-    for idx, p in enumerate(pokemons, start=1):
-        pid = slug_to_id[p["slug"]]
-        print(f"[{idx}/{len(pokemons)}] Scraping moves: {p['name']} ({p['page_url']})")
-        try:
-            move_entries = scrape_pokemon_moves_cloud(session, p["page_url"])
-        except Exception as e:
-            print(f"  ! Failed moves for {p['page_url']}: {e}", file=sys.stderr)
-            time.sleep(args.delay)
-            continue
-
-        for me in move_entries:
-            move_key = me.get("move_key")
-            name = me.get("name") or ""
-            page_url = f"{MOVE_SEARCH_BASE}{move_key}" if move_key else me.get("detail_url")
-            mid = upsert_move(conn, move_key, name, page_url)
-            upsert_pokemon_move(conn, pid, mid, me["method"], me["level"], me["tm_no"])
-            if move_key:
-                seen_move_keys.add(move_key)
-            elif page_url:
-                seen_move_urls.add(page_url)
-        time.sleep(args.delay)
-
-    # Move details (by id)
-    print(f"Scraping move details for {len(seen_move_keys)} unique moves by id")
-    for i, mk in enumerate(sorted(seen_move_keys), start=1):
-        print(f"  [{i}/{len(seen_move_keys)}] move_key={mk} fetching detail ...")
-        try:
-            md = scrape_move_detail_cloud(session, mk)
-        except Exception as e:
-            print(f"  ! Failed move {mk}: {e}", file=sys.stderr)
-            time.sleep(args.delay)
-            continue
-        cur = conn.cursor()
-        cur.execute("SELECT id FROM moves WHERE move_key=?", (mk,))
-        row = cur.fetchone()
-        if row:
-            move_row_id = int(row[0])
-            update_move_record_cloud(conn, move_row_id, md)
-            print(f"    -> ok name='{md.get('name')}' type='{md.get('type')}' url={md.get('page_url')}")
-            if getattr(args, "debug", False):
+    # Move-detail updates are buffered and written with executemany
+    existing_cols = get_moves_columns(conn)
+    pending: List[Tuple[int, Dict]] = []
+
+    def flush_updates(verify: bool = False) -> None:
+        apply_move_updates(conn, pending, existing_cols)
+        if verify and getattr(args, "debug", False):
+            cur = conn.cursor()
+            for move_row_id, _ in pending:
                 # Verify persisted key fields
                 cur.execute("""
                     SELECT startup_time, startup_time_q, startup_time_plus,
@@ -441,45 +707,103 @@ def run(args) -> None:
                 persisted = cur.fetchone()
                 if persisted:
                     st, stq, stp, rt, tt, ttp, dps, da, fw, pr, sb, rg, ef = persisted
-                    print(f"       saved: startup={st} quickclaw={stq} plus={stp} rec={rt} total={tt} total_plus={ttp} dps={dps}")
+                    print(f"       saved id={move_row_id}: startup={st} quickclaw={stq} plus={stp} rec={rt} total={tt} total_plus={ttp} dps={dps}")
                     print(f"              flags: 接触='{da}' 指='{fw}' 守='{pr}' 身代='{sb}' 範囲='{rg}'")
-            if getattr(args, "debug", False) and i <= 3:
-                # Save fetched HTML snapshot for verification
-                try:
-                    import os
-                    out_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "_live_snaps")
-                    os.makedirs(out_dir, exist_ok=True)
-                    # Re-fetch with cloudscraper to capture the final URL variant
-                    html_dbg = cloud_fetch_html(session, md["page_url"])
-                    with open(os.path.join(out_dir, f"cloud_move_{mk}.html"), "w", encoding="utf-8") as f:
-                        f.write(html_dbg)
-                except Exception:
-                    pass
-        if i % 25 == 0:
-            print(f"  ... {i}/{len(seen_move_keys)}")
-        time.sleep(args.delay)
-
-    # Move details (by URL)
-    if seen_move_urls:
-        print(f"Scraping move details for {len(seen_move_urls)} unique moves by URL")
-    for j, mu in enumerate(sorted(seen_move_urls), start=1):
-        print(f"  [{j}/{len(seen_move_urls)}] url={mu} fetching detail ...")
-        try:
-            md = scrape_move_detail_by_url_cloud(session, mu)
-        except Exception as e:
-            print(f"  ! Failed move URL {mu}: {e}", file=sys.stderr)
-            time.sleep(args.delay)
-            continue
-        cur = conn.cursor()
-        cur.execute("SELECT id FROM moves WHERE page_url=?", (mu,))
-        row = cur.fetchone()
-        if row:
-            update_move_record_cloud(conn, int(row[0]), md)
-            print(f"    -> ok name='{md.get('name')}' type='{md.get('type')}' url={md.get('page_url')}")
-        if j % 25 == 0:
-            print(f"  ... {j}/{len(seen_move_urls)}")
-        time.sleep(args.delay)
-
+        pending.clear()
+
+    workers = max(1, int(getattr(args, "workers", 4) or 1))
+    limiter = RateLimiter(workers, args.delay)
+    with ThreadPool(processes=workers) as pool:
+        # Learnsets: fetched concurrently, written in list order so move row ids stay deterministic
+        fetch_learnset = partial(fetch_safely, limiter, scrape_pokemon_moves_cloud, session)
+        learnsets = pool.imap(fetch_learnset, [p["page_url"] for p in pokemons])
+        for idx, (p, (_, move_entries, err)) in enumerate(zip(pokemons, learnsets), start=1):
+            pid = slug_to_id[p["slug"]]
+            print(f"[{idx}/{len(pokemons)}] Scraping moves: {p['name']} ({p['page_url']})")
+            if err is not None:
+                print(f"  ! Failed moves for {p['page_url']}: {err}", file=sys.stderr)
+                continue
+
+            # One transaction per pokemon instead of one commit per statement
+            with conn:
+                for me in move_entries:
+                    move_key = me.get("move_key")
+                    name = me.get("name") or ""
+                    page_url = f"{MOVE_SEARCH_BASE}{move_key}" if move_key else me.get("detail_url")
+                    mid = upsert_move(conn, move_key, name, page_url)
+                    upsert_pokemon_move(conn, pid, mid, me["method"], me["level"], me["tm_no"])
+                    if move_key:
+                        seen_move_keys.add(move_key)
+                    elif page_url:
+                        seen_move_urls.add(page_url)
+
+        # Move details (by id); the main thread owns the sqlite3 connection and does all writes
+        print(f"Scraping move details for {len(seen_move_keys)} unique moves by id")
+        id_by_key: Dict[int, int] = dict(
+            conn.execute("SELECT move_key, id FROM moves WHERE move_key IS NOT NULL").fetchall()
+        )
+        details = pool.imap_unordered(
+            partial(fetch_safely, limiter, scrape_move_detail_cloud, session),
+            sorted(seen_move_keys),
+            chunksize=map_chunksize(len(seen_move_keys), workers),
+        )
+        for i, (mk, md, err) in enumerate(details, start=1):
+            print(f"  [{i}/{len(seen_move_keys)}] move_key={mk} fetched detail")
+            if err is not None:
+                print(f"  ! Failed move {mk}: {err}", file=sys.stderr)
+                continue
+            move_row_id = id_by_key.get(mk)
+            if move_row_id is not None:
+                pending.append((move_row_id, md))
+                print(f"    -> ok name='{md.get('name')}' type='{md.get('type')}' url={md.get('page_url')}")
+                if getattr(args, "debug", False) and i <= 3:
+                    # Save fetched HTML snapshot for verification
+                    try:
+                        import os
+                        out_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "_live_snaps")
+                        os.makedirs(out_dir, exist_ok=True)
+                        # Re-fetch with cloudscraper to capture the final URL variant
+                        html_dbg = limiter.call(cloud_fetch_html, session, md["page_url"])
+                        with open(os.path.join(out_dir, f"cloud_move_{mk}.html"), "w", encoding="utf-8") as f:
+                            f.write(html_dbg)
+                    except Exception:
+                        pass
+            if len(pending) >= MOVE_COMMIT_EVERY:
+                flush_updates(verify=True)
+            if i % 25 == 0:
+                print(f"  ... {i}/{len(seen_move_keys)}")
+        flush_updates(verify=True)
+
+        # Move details (by URL)
+        if seen_move_urls:
+            print(f"Scraping move details for {len(seen_move_urls)} unique moves by URL")
+        # page_url is not unique: ORDER BY id DESC so the lowest id wins, as the old per-row SELECT did
+        id_by_url: Dict[str, int] = dict(
+            conn.execute("SELECT page_url, id FROM moves WHERE page_url IS NOT NULL ORDER BY id DESC").fetchall()
+        )
+        url_details = pool.imap_unordered(
+            partial(fetch_safely, limiter, scrape_move_detail_by_url_cloud, session),
+            sorted(seen_move_urls),
+            chunksize=map_chunksize(len(seen_move_urls), workers),
+        )
+        for j, (mu, md, err) in enumerate(url_details, start=1):
+            print(f"  [{j}/{len(seen_move_urls)}] url={mu} fetched detail")
+            if err is not None:
+                print(f"  ! Failed move URL {mu}: {err}", file=sys.stderr)
+                continue
+            move_row_id = id_by_url.get(mu)
+            if move_row_id is not None:
+                pending.append((move_row_id, md))
+                print(f"    -> ok name='{md.get('name')}' type='{md.get('type')}' url={md.get('page_url')}")
+            if len(pending) >= MOVE_COMMIT_EVERY:
+                flush_updates()
+            if j % 25 == 0:
+                print(f"  ... {j}/{len(seen_move_urls)}")
+        flush_updates()
+
+    # Refresh planner statistics once the data is loaded so the indexes above get picked
+    conn.execute("ANALYZE")
+    conn.commit()
     print("Done.")
 
 
@@ -489,6 +813,7 @@ def main() -> None:
     parser.add_argument("--db", required=True, help="Output SQLite path")
     parser.add_argument("--limit", type=int, default=0, help="Limit number of pokemons (0 = all)")
     parser.add_argument("--delay", type=float, default=0.6, help="Delay between requests (seconds)")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent HTTP requests (request starts stay --delay seconds apart overall)")
     parser.add_argument("--debug", action="store_true", help="Save a few move detail HTML snapshots for verification")
     args = parser.parse_args()
     run(args)
@@ -1,27 +1,57 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List, Literal, Optional, Sequence, Tuple
+import asyncio
+import base64
+import itertools
+import json
 import os
+import sqlite3
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Annotated, Any, Dict, FrozenSet, Iterator, List, Literal, Optional, Sequence, Tuple, Union
 
 from fastapi import APIRouter, FastAPI, HTTPException
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel, Field, ValidationError
 
 from src.db import (
     DEFAULT_DB_PATH,
     build_like,
     detect_json1_enabled,
-    execute_one,
-    execute_query,
-    get_connection,
-    get_table_columns,
+    execute_query_columnar,
+    borrow_conn,
+    get_table_column_list,
 )
 
+try:
+    # orjson is a declared dependency; fall back to the stdlib encoder if it is not installed
+    import orjson  # type: ignore
+except Exception:  # pragma: no cover
+    orjson = None  # type: ignore
+
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+
+def _json_dumps(obj: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """検索系ルートはハンドラの dict をそのまま返す（response_model による再検証を省く）。
+    非推奨の ORJSONResponse には頼らず、_json_dumps（orjson / stdlib json）で直接エンコードする。"""
+
+    def render(self, content: Any) -> bytes:
+        return _json_dumps(content)
+
 
 # -----------------------------
 # Pydantic models (inputs/outputs with docs)
 # -----------------------------
 class SearchPokemonsInput(BaseModel):
-    name_like: Optional[str] = Field(None, description="ポケモン名の部分一致（%...%）")
+    name_like: Optional[str] = Field(None, description="ポケモン名の部分一致（%...%）。末尾を % にすると前方一致（例: 'フシギ%'）")
     types: Optional[List[str]] = Field(None, description="タイプで絞り込み。例: ['くさ','フェアリー']")
     type_mode: Literal["any", "all"] = Field("any", description="'any'=いずれか一致 / 'all'=全て一致")
     dex_no_min: Optional[int] = Field(None, description="図鑑番号の下限")
@@ -40,10 +70,12 @@ class SearchPokemonsInput(BaseModel):
     speed_max: Optional[int] = Field(None, description="すばやさ(speed/spe)の上限")
     bst_min: Optional[int] = Field(None, description="種族値合計(bst/total/sum)の下限")
     bst_max: Optional[int] = Field(None, description="種族値合計(bst/total/sum)の上限")
-    obtain_method_like: Optional[str] = Field(None, description="入手方法の部分一致（%...%）")
+    obtain_method_like: Optional[str] = Field(None, description="入手方法の部分一致（%...%）。末尾を % にすると前方一致（例: 'メガストーン%'）")
+    fields: Optional[List[str]] = Field(None, description="返す列名のリスト（id とソート列は常に含む）。未指定時は主要列すべて。例: ['name','types_json','total']")
     sort: Optional[List[str]] = Field(None, description='並び順。例: ["-bst","speed"]（先頭の-で降順）')
     limit: int = Field(10, description="取得件数（デフォルト10）")
-    offset: int = Field(0, description="スキップ件数")
+    offset: int = Field(0, description="スキップ件数（非推奨: 深いページは cursor を使う）")
+    cursor: Optional[str] = Field(None, description="前回レスポンスの next_cursor。指定時は offset を無視して続きから返す（sort は前回と同じにすること）")
 
     model_config = {
         "json_schema_extra": {
@@ -63,7 +95,7 @@ class SearchPokemonsInput(BaseModel):
 
 
 class SearchMovesInput(BaseModel):
-    name_like: Optional[str] = Field(None, description="技名の部分一致（%...%）")
+    name_like: Optional[str] = Field(None, description="技名の部分一致（%...%）。末尾を % にすると前方一致（例: 'マッハ%'）")
     type: Optional[List[str]] = Field(None, description="タイプで絞り込み。例: ['かくとう']")
     category: Optional[List[str]] = Field(None, description="分類。例: ['物理','特殊','変化']")
     power_min: Optional[int] = Field(None, description="威力の下限")
@@ -84,10 +116,11 @@ class SearchMovesInput(BaseModel):
     finger_wag: Optional[Literal["出る", "出ない"]] = Field(None, description="ゆびをふる。'出る' or '出ない'")
     protect: Optional[Literal["－", "通常"]] = Field(None, description="まもる。'－' or '通常'")
     substitute: Optional[Literal["－", "通常"]] = Field(None, description="みがわり。'－' or '通常'")
-    range_like: Optional[str] = Field(None, description="範囲の部分一致（%...%）")
+    range_like: Optional[str] = Field(None, description="範囲の部分一致（%...%）。末尾を % にすると前方一致（例: '自分%'）")
     sort: Optional[List[str]] = Field(None, description='並び順。例: ["-dps","total_time"]')
     limit: int = Field(10, description="取得件数（デフォルト10）")
-    offset: int = Field(0, description="スキップ件数")
+    offset: int = Field(0, description="スキップ件数（非推奨: 深いページは cursor を使う）")
+    cursor: Optional[str] = Field(None, description="前回レスポンスの next_cursor。指定時は offset を無視して続きから返す（sort は前回と同じにすること）")
 
     model_config = {
         "json_schema_extra": {
@@ -110,15 +143,68 @@ class SearchMovesInput(BaseModel):
 
 
 class SearchPokemonsOutput(BaseModel):
-    items: List[Dict[str, Any]] = Field(..., description="ポケモン行のリスト（DB列をすべて含む）")
+    items: List[Dict[str, Any]] = Field(..., description="ポケモン行のリスト（fields 未指定時は主要なDB列をすべて含む）")
     limit: int = Field(..., description="返却件数")
     offset: int = Field(..., description="スキップ件数")
+    next_cursor: Optional[str] = Field(None, description="次ページ取得用のカーソル（続きが無い場合は null）")
 
 
 class SearchMovesOutput(BaseModel):
     items: List[Dict[str, Any]] = Field(..., description="技行のリスト（DB列をすべて含む）")
     limit: int = Field(..., description="返却件数")
     offset: int = Field(..., description="スキップ件数")
+    next_cursor: Optional[str] = Field(None, description="次ページ取得用のカーソル（続きが無い場合は null）")
+
+
+class SearchPokemonsOutputV2(BaseModel):
+    columns: List[str] = Field(..., description="rows の各要素に対応する列名")
+    rows: List[List[Any]] = Field(..., description="ポケモン行（columns と同じ並びの値の配列）")
+    limit: int = Field(..., description="返却件数")
+    offset: int = Field(..., description="スキップ件数")
+    next_cursor: Optional[str] = Field(None, description="次ページ取得用のカーソル（続きが無い場合は null）")
+
+
+class SearchMovesOutputV2(BaseModel):
+    columns: List[str] = Field(..., description="rows の各要素に対応する列名")
+    rows: List[List[Any]] = Field(..., description="技行（columns と同じ並びの値の配列）")
+    limit: int = Field(..., description="返却件数")
+    offset: int = Field(..., description="スキップ件数")
+    next_cursor: Optional[str] = Field(None, description="次ページ取得用のカーソル（続きが無い場合は null）")
+
+
+class BatchSearchPokemonsItem(SearchPokemonsInput):
+    kind: Literal["search_pokemons"] = Field(..., description="'search_pokemons' 固定")
+
+
+class BatchSearchMovesItem(SearchMovesInput):
+    kind: Literal["search_moves"] = Field(..., description="'search_moves' 固定")
+
+
+class BatchSearchInput(BaseModel):
+    requests: List[Annotated[Union[BatchSearchPokemonsItem, BatchSearchMovesItem], Field(discriminator="kind")]] = Field(
+        ...,
+        max_length=32,
+        description="検索リクエストの配列（各要素は kind で search_pokemons / search_moves を指定。最大32件）",
+    )
+
+    model_config = {
+        "json_schema_extra": {
+            "examples": [
+                {
+                    "requests": [
+                        {"kind": "search_pokemons", "types": ["かくとう"], "sort": ["-total"], "limit": 5},
+                        {"kind": "search_moves", "type": ["かくとう"], "sort": ["-dps"], "limit": 5},
+                    ]
+                }
+            ]
+        }
+    }
+
+
+class BatchSearchOutput(BaseModel):
+    results: List[Union[SearchPokemonsOutput, SearchMovesOutput]] = Field(
+        ..., description="requests と同じ順序の検索結果"
+    )
 
 
 class PokemonMoveItem(BaseModel):
@@ -164,52 +250,419 @@ class GetPokemonDetailInput(BaseModel):
 class GetMoveDetailInput(BaseModel):
     id: Optional[int] = None
     name: Optional[str] = None
+    pokemon_fields: Optional[List[str]] = Field(None, description="pokemons[].pokemon に含める列名（id は常に含む）。未指定時は主要列すべて")
 
 
 # -----------------------------
 # Helpers
 # -----------------------------
-def _parse_sort(sort_list: Optional[List[str]], allowed: List[str]) -> str:
-    if not sort_list:
-        return ""
-    order_clauses: List[str] = []
-    allowed_set = set(allowed)
-    for raw in sort_list:
-        direction = "ASC"
-        key = raw
-        if raw.startswith("-"):
-            direction = "DESC"
-            key = raw[1:]
-        if key not in allowed_set:
-            raise ValueError(f"Unsupported sort field: {key}")
-        order_clauses.append(f"{key} {direction}")
-    return (" ORDER BY " + ", ".join(order_clauses)) if order_clauses else ""
+# IN (...) 用プレースホルダ文字列（0〜32 個分を事前生成）
+_PLACEHOLDERS: Tuple[str, ...] = tuple(",".join(["?"] * i) for i in range(33))
+
+
+def _placeholders(n: int) -> str:
+    if n < len(_PLACEHOLDERS):
+        return _PLACEHOLDERS[n]
+    return ",".join(["?"] * n)
+
+
+# (列名, 降順か, "col ASC|DESC")
+SortKey = Tuple[str, bool, str]
+
+_ID_TIEBREAK: Dict[bool, SortKey] = {False: ("id", False, "id ASC"), True: ("id", True, "id DESC")}
+
+
+def _build_sort_map(cols: Sequence[str]) -> Dict[str, SortKey]:
+    """許可列から sort トークン -> SortKey の表を作る（"bst" / "-bst" の両方を登録）。"""
+    sort_map: Dict[str, SortKey] = {}
+    for c in cols:
+        sort_map[c] = (c, False, f"{c} ASC")
+        sort_map["-" + c] = (c, True, f"{c} DESC")
+    return sort_map
+
+
+def _parse_sort_fast(sort_list: Optional[List[str]], sort_map: Dict[str, SortKey]) -> List[SortKey]:
+    """sort 指定を表引きで SortKey のリストにする。末尾には常に id を付けて順序を一意にする
+    （向きは直前のキーに揃え、(col, id) 索引を一方向に走査できるようにする）。"""
+    try:
+        keys = [sort_map[raw] for raw in sort_list] if sort_list else []
+    except KeyError as e:
+        bad = str(e.args[0])
+        raise ValueError(f"Unsupported sort field: {bad[1:] if bad.startswith('-') else bad}")
+    keys.append(_ID_TIEBREAK[keys[-1][1] if keys else False])
+    return keys
+
+
+@lru_cache(maxsize=256)
+def _search_sql(table: str, select_cols: Tuple[str, ...], where: Tuple[str, ...], order: Tuple[str, ...]) -> str:
+    """検索 SQL 本文を形（射影列 / WHERE 断片 / ORDER BY 断片）ごとにキャッシュする。
+    同じ形なら同一の文字列が返るので、接続側の statement キャッシュもそのまま当たる。"""
+    where_sql = (" WHERE " + " AND ".join(where)) if where else ""
+    return f"SELECT {', '.join(select_cols)} FROM {table}{where_sql} ORDER BY {', '.join(order)} LIMIT ? OFFSET ?"
 
 
-def _select_existing_columns(table_cols: List[str], existing: List[str]) -> List[str]:
-    existing_set = set(existing)
-    return [c for c in table_cols if c in existing_set]
+@contextmanager
+def _use_conn(conn: Optional[sqlite3.Connection]) -> Iterator[sqlite3.Connection]:
+    """呼び出し側の接続があればそれを使い、無ければプールから借りる。"""
+    if conn is not None:
+        yield conn
+    else:
+        with borrow_conn() as borrowed:
+            yield borrowed
 
 
 # -----------------------------
-# search_pokemons
+# Keyset (cursor) pagination
 # -----------------------------
-def search_pokemons_handler(payload: SearchPokemonsInput) -> Dict[str, Any]:
-    conn = get_connection()
-    try:
-        json1 = detect_json1_enabled(conn)
-        pcols = list(get_table_columns(conn, "pokemons"))
-    finally:
-        pass
+def _encode_cursor(keys: Sequence[SortKey], row: Dict[str, Any]) -> str:
+    raw = json.dumps(
+        {"k": [(c, d) for c, d, _ in keys], "v": [row.get(c) for c, _, _ in keys]},
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
 
-    # Select all columns to keep compatibility with varying schemas
-    select_cols_sql = "*"
 
-    def _resolve(col_candidates: List[str]) -> Optional[str]:
-        for c in col_candidates:
-            if c in pcols:
-                return c
+def _decode_cursor(cursor: str, keys: List[SortKey]) -> List[Any]:
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        cur_keys = [(str(c), bool(d)) for c, d in data["k"]]
+        values = list(data["v"])
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if cur_keys != [(c, d) for c, d, _ in keys] or len(values) != len(keys):
+        raise ValueError("cursor does not match the requested sort")
+    # 値は SQL のバインド値になるため、バインドできないもの（list/dict、64bit 超の整数）は弾く
+    for v in values:
+        if not (v is None or isinstance(v, (float, str)) or (isinstance(v, int) and -(2**63) <= v < 2**63)):
+            raise ValueError("Invalid cursor")
+    return values
+
+
+def _keyset_predicate(keys: List[SortKey], values: List[Any]) -> Tuple[str, List[Any]]:
+    """(k1, k2, ..., id) が直前ページ末尾の値より「後ろ」にある行の条件を組み立てる。
+    SQLite の NULL は ASC で先頭・DESC で末尾に並ぶので、それに合わせて比較する。
+    """
+    ors: List[str] = []
+    params: List[Any] = []
+    for i, (col, desc, _) in enumerate(keys):
+        terms: List[str] = []
+        term_params: List[Any] = []
+        for (prev_col, _, _), prev_val in zip(keys[:i], values[:i]):
+            terms.append(f"{prev_col} IS ?")
+            term_params.append(prev_val)
+        val = values[i]
+        if val is None:
+            if desc:
+                continue  # DESC では NULL が最後なので、この列でこれより後ろの値はない
+            terms.append(f"{col} IS NOT NULL")
+        elif desc:
+            terms.append(f"({col} < ? OR {col} IS NULL)")
+            term_params.append(val)
+        else:
+            terms.append(f"{col} > ?")
+            term_params.append(val)
+        ors.append("(" + " AND ".join(terms) + ")")
+        params.extend(term_params)
+    if not ors:
+        return "0", []
+    return "(" + " OR ".join(ors) + ")", params
+
+
+def _next_cursor(keys: Sequence[SortKey], columns: List[str], rows: List[Tuple[Any, ...]], limit: int) -> Optional[str]:
+    if limit <= 0 or len(rows) < limit:
         return None
+    return _encode_cursor(keys, dict(zip(columns, rows[-1])))
+
+
+def _run_search(
+    conn: Optional[sqlite3.Connection],
+    sql: str,
+    params: List[Any],
+    select_cols: Sequence[str],
+    keys: Sequence[SortKey],
+    limit: int,
+    offset: int,
+) -> Dict[str, Any]:
+    if limit <= 0:
+        # 0 件要求は SQLite に問い合わせずに返す
+        return {"columns": list(select_cols), "rows": [], "limit": limit, "offset": offset, "next_cursor": None}
+    with _use_conn(conn) as c:
+        cols, rows = execute_query_columnar(c, sql, params)
+    return {
+        "columns": cols,
+        "rows": rows,
+        "limit": limit,
+        "offset": offset,
+        "next_cursor": _next_cursor(keys, cols, rows, limit),
+    }
+
+
+def _columnar_to_items(out: Dict[str, Any]) -> Dict[str, Any]:
+    # 列指向の結果を従来の items 形式へ（列名リストは全行で共有）
+    cols = out["columns"]
+    return {
+        "items": [dict(zip(cols, r)) for r in out["rows"]],
+        "limit": out["limit"],
+        "offset": out["offset"],
+        "next_cursor": out["next_cursor"],
+    }
+
+
+# スキーマはプロセス生存中は不変とみなし、PRAGMA/json1 判定は DB パスごとに1回だけ行う
+# （スクレイパでスキーマを変えた場合はサーバを再起動するか cache_clear() する）
+@lru_cache(maxsize=None)
+def _cached_columns(db_path: str, table: str) -> Tuple[FrozenSet[str], Tuple[str, ...]]:
+    with borrow_conn(db_path) as conn:
+        cols = get_table_column_list(conn, table)
+    return frozenset(cols), tuple(cols)
+
+
+@lru_cache(maxsize=None)
+def _cached_json1(db_path: str) -> bool:
+    with borrow_conn(db_path) as conn:
+        return detect_json1_enabled(conn)
+
+
+# pokemon_types テーブル（スクレイパが作成）をタイプ絞り込みに使う。ZA_USE_POKEMON_TYPES=0 で従来経路
+USE_POKEMON_TYPES = os.environ.get("ZA_USE_POKEMON_TYPES", "1") != "0"
+
+# 技の射影列（スキーマに存在するものだけを _SchemaCtx で選ぶ）
+_MOVE_BASE_SELECT_COLS: Tuple[str, ...] = (
+    "id",
+    "move_key",
+    "name",
+    "type",
+    "category",
+    "power",
+    "activation_time",
+    "startup_time",
+    "startup_time_q",
+    "startup_time_plus",
+    "recovery_time",
+    "total_time",
+    "total_time_plus",
+    "dps",
+    "direct_attack",
+    "finger_wag",
+    "protect",
+    "substitute",
+    "range_",
+    "effect",
+    "page_url",
+)
+
+# (入力フィールド接頭辞, 列名候補) — 最初に存在した列を使う
+_POKEMON_RANGED_CANDIDATES: Tuple[Tuple[str, Tuple[str, ...]], ...] = (
+    ("dex_no", ("dex_no",)),
+    ("hp", ("hp",)),
+    ("attack", ("attack", "atk")),
+    ("defense", ("defense", "def")),
+    ("sp_attack", ("sp_attack", "sp_atk", "spa")),
+    ("sp_defense", ("sp_defense", "sp_def", "spd")),
+    ("speed", ("speed", "spe")),
+    ("bst", ("bst", "total", "sum")),
+)
+
+# 検索/技詳細で既定で返すポケモン列（存在するものだけ。並びは pokemons テーブルの列順に合わせる）
+_DEFAULT_POKEMON_COLS: Tuple[str, ...] = (
+    "id",
+    "dex_no",
+    "name",
+    "types_json",
+    "obtain_method",
+    "hp",
+    "attack", "atk",
+    "defense", "def", "def_",
+    "sp_attack", "sp_atk", "spa",
+    "sp_defense", "sp_def", "spd",
+    "speed", "spe",
+    "bst", "total", "sum",
+    "slug",
+    "page_url",
+)
+
+_POKEMON_SORT_CANDIDATES: Tuple[str, ...] = (
+    "name",
+    "dex_no",
+    "hp",
+    "attack", "atk",
+    "defense", "def",
+    "sp_attack", "sp_atk", "spa",
+    "sp_defense", "sp_def", "spd",
+    "speed", "spe",
+    "bst", "total", "sum",
+)
+
+_MOVE_ALLOWED_SORT: Tuple[str, ...] = (
+    "name",
+    "power",
+    "activation_time",
+    "startup_time",
+    "startup_time_q",
+    "recovery_time",
+    "total_time",
+    "dps",
+)
+
+# 技の数値範囲: (下限フィールド名, 上限フィールド名, "{col} >= ?", "{col} <= ?")
+_MOVE_RANGED_SPECS: Tuple[Tuple[str, str, str, str], ...] = tuple(
+    (f"{col}_min", f"{col}_max", f"{col} >= ?", f"{col} <= ?")
+    for col in ("power", "activation_time", "startup_time", "startup_time_q", "recovery_time", "total_time", "dps")
+)
+
+# 技のソート表はスキーマに依存しないので import 時に作る
+_MOVE_SORT_MAP: Dict[str, SortKey] = _build_sort_map(_MOVE_ALLOWED_SORT)
+
+# これ以外の入力フィールドが指定されていなければ「絞り込みなし・既定ソート」の検索（kind は batch_search 用）
+_PLAIN_SEARCH_FIELDS: FrozenSet[str] = frozenset({"limit", "offset", "kind"})
+_PLAIN_SORT_KEYS: Tuple[SortKey, ...] = tuple(_parse_sort_fast(None, {}))
+
+
+@dataclass(frozen=True)
+class _SchemaCtx:
+    """スキーマだけで決まる検索用の断片（DB パスごとに1回だけ組み立てる）。"""
+
+    pokemon_cols: FrozenSet[str]
+    move_cols: FrozenSet[str]
+    move_select_cols: Tuple[str, ...]  # 返す技の列（moves に存在する列のみ、先頭は id）
+    move_select_sql_m: str  # 同上を "m." 付きで結合したもの（JOIN 用）
+    move_json_object_m: str  # 同上を json_object('id', m.id, ...) にしたもの（json1 用）
+    pokemon_select_cols: Tuple[str, ...]  # pokemons の全列（SELECT * と同じ並び）
+    pokemon_select_sql_p: str  # 同上を "p." 付きで（JOIN 用）
+    pokemon_default_cols: Tuple[str, ...]  # _DEFAULT_POKEMON_COLS のうち存在する列
+    pokemon_sort_map: Dict[str, SortKey]  # sort トークン -> SortKey（存在する列のみ）
+    move_sort_map: Dict[str, SortKey]
+    # (列名, 下限フィールド名, 上限フィールド名, "{col} >= ?", "{col} <= ?")
+    ranged_specs_resolved: Tuple[Tuple[str, str, str, str, str], ...]
+    has_pokemon_types: bool  # pokemon_types テーブルをタイプ絞り込みに使うか
+    pokemon_plain_sql: str  # 絞り込み・ソート指定なし（既定列、id 順）の検索 SQL
+    move_plain_sql: str
+
+
+@lru_cache(maxsize=None)
+def _schema_ctx(db_path: str) -> _SchemaCtx:
+    pcols, pcols_ordered = _cached_columns(db_path, "pokemons")
+    mcols = _cached_columns(db_path, "moves")[0]
+    msel = tuple(c for c in _MOVE_BASE_SELECT_COLS if c in mcols)
+    pdefault = tuple(c for c in _DEFAULT_POKEMON_COLS if c in pcols)
+    plain_order = tuple(k[2] for k in _PLAIN_SORT_KEYS)
+    ranged: List[Tuple[str, str, str, str, str]] = []
+    for field, candidates in _POKEMON_RANGED_CANDIDATES:
+        col = next((c for c in candidates if c in pcols), None)
+        if col:
+            ranged.append((col, f"{field}_min", f"{field}_max", f"{col} >= ?", f"{col} <= ?"))
+    return _SchemaCtx(
+        pokemon_cols=pcols,
+        move_cols=mcols,
+        move_select_cols=msel,
+        move_select_sql_m=", ".join(f"m.{c}" for c in msel),
+        move_json_object_m="json_object(" + ", ".join(f"'{c}', m.{c}" for c in msel) + ")",
+        pokemon_select_cols=pcols_ordered,
+        pokemon_select_sql_p=", ".join(f"p.{c}" for c in pcols_ordered),
+        pokemon_default_cols=pdefault,
+        pokemon_sort_map=_build_sort_map([c for c in _POKEMON_SORT_CANDIDATES if c in pcols]),
+        move_sort_map=_MOVE_SORT_MAP,
+        ranged_specs_resolved=tuple(ranged),
+        has_pokemon_types=USE_POKEMON_TYPES and "pokemon_id" in _cached_columns(db_path, "pokemon_types")[0],
+        pokemon_plain_sql=_search_sql("pokemons", pdefault, (), plain_order),
+        move_plain_sql=_search_sql("moves", msel, (), plain_order),
+    )
+
+
+def _pokemon_projection(
+    ctx: _SchemaCtx, fields: Optional[List[str]], required: Sequence[str] = ()
+) -> Tuple[str, ...]:
+    """返すポケモン列を決める。未知の列名は ValueError（REST では 400）。"""
+    if not fields:
+        cols: Sequence[str] = ctx.pokemon_default_cols
+    else:
+        unknown = [f for f in fields if f not in ctx.pokemon_cols]
+        if unknown:
+            raise ValueError(f"Unknown pokemon field(s): {', '.join(unknown)}")
+        cols = fields
+    return tuple(dict.fromkeys(("id", *cols, *required)))
+
+
+def _append_type_filter(
+    types: List[str],
+    mode: str,
+    ctx: _SchemaCtx,
+    json1: bool,
+    where: List[str],
+    params: List[Any],
+) -> None:
+    """タイプ条件を where/params に追加する。
+    pokemon_types テーブル > type1/type2 列 > json_each > types_json LIKE の順で使えるものを選ぶ。
+    """
+    if ctx.has_pokemon_types:
+        # Normalized join table (see scrape_za.migrate_pokemon_types_schema)
+        uniq = list(dict.fromkeys(types))
+        placeholders = _placeholders(len(uniq))
+        if mode == "any":
+            where.append(
+                f"EXISTS (SELECT 1 FROM pokemon_types pt WHERE pt.pokemon_id = pokemons.id AND pt.type IN ({placeholders}))"
+            )
+            params.extend(uniq)
+        else:  # all
+            where.append(
+                "(SELECT COUNT(DISTINCT pt.type) FROM pokemon_types pt "
+                f"WHERE pt.pokemon_id = pokemons.id AND pt.type IN ({placeholders})) = ?"
+            )
+            params.extend(uniq)
+            params.append(len(uniq))
+    elif "type1" in ctx.pokemon_cols and "type2" in ctx.pokemon_cols:
+        # Indexed type1/type2 columns (see scrape_za.migrate_pokemons_schema)
+        if mode == "any":
+            placeholders = _placeholders(len(types))
+            where.append(f"(type1 IN ({placeholders}) OR type2 IN ({placeholders}))")
+            params.extend(types)
+            params.extend(types)
+        else:  # all
+            for t in types:
+                where.append("(type1 = ? OR type2 = ?)")
+                params.extend([t, t])
+    elif json1:
+        if mode == "any":
+            placeholders = _placeholders(len(types))
+            where.append(
+                f"EXISTS (SELECT 1 FROM json_each(pokemons.types_json) je WHERE je.value IN ({placeholders}))"
+            )
+            params.extend(types)
+        else:  # all
+            for t in types:
+                where.append(
+                    "EXISTS (SELECT 1 FROM json_each(pokemons.types_json) je WHERE je.value = ?)"
+                )
+                params.append(t)
+    else:
+        if mode == "any":
+            ors = []
+            for t in types:
+                ors.append('types_json LIKE ?')
+                params.append(f'%"{t}"%')
+            where.append("(" + " OR ".join(ors) + ")")
+        else:
+            for t in types:
+                where.append('types_json LIKE ?')
+                params.append(f'%"{t}"%')
+
+
+# -----------------------------
+# search_pokemons
+# -----------------------------
+def search_pokemons_columnar_handler(
+    payload: SearchPokemonsInput, conn: Optional[sqlite3.Connection] = None
+) -> Dict[str, Any]:
+    ctx = _schema_ctx(DEFAULT_DB_PATH)
+    if payload.model_fields_set <= _PLAIN_SEARCH_FIELDS:
+        # 絞り込み/ソート/カーソル/fields 無し（最頻出）: 組み立て済み SQL をそのまま使う
+        limit = max(0, int(payload.limit if payload.limit is not None else 10))
+        offset = max(0, int(payload.offset or 0))
+        return _run_search(
+            conn, ctx.pokemon_plain_sql, [limit, offset], ctx.pokemon_default_cols, _PLAIN_SORT_KEYS, limit, offset
+        )
+    json1 = _cached_json1(DEFAULT_DB_PATH)
 
     where: List[str] = []
     params: List[Any] = []
@@ -221,135 +674,74 @@ def search_pokemons_handler(payload: SearchPokemonsInput) -> Dict[str, Any]:
         where.append("obtain_method LIKE ?")
         params.append(build_like(payload.obtain_method_like))
 
-    # Numeric ranges
-    ranged_specs: List[Tuple[List[str], Optional[int], Optional[int]]] = [
-        (["dex_no"], payload.dex_no_min, payload.dex_no_max),
-        (["hp"], payload.hp_min, payload.hp_max),
-        (["attack", "atk"], payload.attack_min, payload.attack_max),
-        (["defense", "def"], payload.defense_min, payload.defense_max),
-        (["sp_attack", "sp_atk", "spa"], payload.sp_attack_min, payload.sp_attack_max),
-        (["sp_defense", "sp_def", "spd"], payload.sp_defense_min, payload.sp_defense_max),
-        (["speed", "spe"], payload.speed_min, payload.speed_max),
-        (["bst", "total", "sum"], payload.bst_min, payload.bst_max),
-    ]
-    for candidates, mn, mx in ranged_specs:
-        col = _resolve(candidates)
-        if not col:
-            continue
+    # Numeric ranges (columns resolved once per schema)
+    for _col, min_field, max_field, ge_sql, le_sql in ctx.ranged_specs_resolved:
+        mn = getattr(payload, min_field)
+        mx = getattr(payload, max_field)
         if mn is not None:
-            where.append(f"{col} >= ?")
+            where.append(ge_sql)
             params.append(mn)
         if mx is not None:
-            where.append(f"{col} <= ?")
+            where.append(le_sql)
             params.append(mx)
 
     # Type filters
     if payload.types:
         types = [t for t in payload.types if t]
         if types:
-            if json1:
-                if payload.type_mode == "any":
-                    placeholders = ",".join(["?"] * len(types))
-                    where.append(
-                        f"EXISTS (SELECT 1 FROM json_each(pokemons.types_json) je WHERE je.value IN ({placeholders}))"
-                    )
-                    params.extend(types)
-                else:  # all
-                    for t in types:
-                        where.append(
-                            "EXISTS (SELECT 1 FROM json_each(pokemons.types_json) je WHERE je.value = ?)"
-                        )
-                        params.append(t)
-            else:
-                if payload.type_mode == "any":
-                    ors = []
-                    for t in types:
-                        ors.append('types_json LIKE ?')
-                        params.append(f'%"{t}"%')
-                    where.append("(" + " OR ".join(ors) + ")")
-                else:
-                    for t in types:
-                        where.append('types_json LIKE ?')
-                        params.append(f'%"{t}"%')
-
-    where_sql = (" WHERE " + " AND ".join(where)) if where else ""
+            _append_type_filter(types, payload.type_mode, ctx, json1, where, params)
 
-    # Sorting
-    candidate_sort = [
-        "name",
-        "dex_no",
-        "hp",
-        "attack", "atk",
-        "defense", "def",
-        "sp_attack", "sp_atk", "spa",
-        "sp_defense", "sp_def", "spd",
-        "speed", "spe",
-        "bst", "total", "sum",
-    ]
-    allowed_sort = [c for c in candidate_sort if c in pcols]
-    order_sql = _parse_sort(payload.sort, allowed_sort) if payload.sort else ""
-
-    limit = max(0, int(payload.limit or 10))
+    # Sorting (+ keyset predicate when continuing from a cursor)
+    keys = _parse_sort_fast(payload.sort, ctx.pokemon_sort_map)
     offset = max(0, int(payload.offset or 0))
+    if payload.cursor:
+        pred, pred_params = _keyset_predicate(keys, _decode_cursor(payload.cursor, keys))
+        where.append(pred)
+        params.extend(pred_params)
+        offset = 0
 
-    sql = f"SELECT {select_cols_sql} FROM pokemons{where_sql}{order_sql} LIMIT ? OFFSET ?"
+    # Projection: requested fields (or the default set) + the sort keys the cursor needs
+    select_cols = _pokemon_projection(ctx, payload.fields, [c for c, _, _ in keys])
+
+    limit = max(0, int(payload.limit if payload.limit is not None else 10))
+
+    sql = _search_sql("pokemons", select_cols, tuple(where), tuple(k[2] for k in keys))
     params.extend([limit, offset])
-    items = execute_query(get_connection(), sql, params)
-    return {"items": items, "limit": limit, "offset": offset}
+    return _run_search(conn, sql, params, select_cols, keys, limit, offset)
+
+
+def search_pokemons_handler(
+    payload: SearchPokemonsInput, conn: Optional[sqlite3.Connection] = None
+) -> Dict[str, Any]:
+    return _columnar_to_items(search_pokemons_columnar_handler(payload, conn=conn))
 
 
 # -----------------------------
 # search_moves
 # -----------------------------
-def search_moves_handler(payload: SearchMovesInput) -> Dict[str, Any]:
-    conn = get_connection()
-    try:
-        mcols = list(get_table_columns(conn, "moves"))
-    finally:
-        pass
-
-    base_select_cols = [
-        "id",
-        "move_key",
-        "name",
-        "type",
-        "category",
-        "power",
-        "activation_time",
-        "startup_time",
-        "startup_time_q",
-        "startup_time_plus",
-        "recovery_time",
-        "total_time",
-        "total_time_plus",
-        "dps",
-        "direct_attack",
-        "finger_wag",
-        "protect",
-        "substitute",
-        "range_",
-        "effect",
-        "page_url",
-    ]
-    select_cols = _select_existing_columns(base_select_cols, mcols)
+def search_moves_columnar_handler(
+    payload: SearchMovesInput, conn: Optional[sqlite3.Connection] = None
+) -> Dict[str, Any]:
+    ctx = _schema_ctx(DEFAULT_DB_PATH)
+    if payload.model_fields_set <= _PLAIN_SEARCH_FIELDS:
+        limit = max(0, int(payload.limit if payload.limit is not None else 10))
+        offset = max(0, int(payload.offset or 0))
+        return _run_search(
+            conn, ctx.move_plain_sql, [limit, offset], ctx.move_select_cols, _PLAIN_SORT_KEYS, limit, offset
+        )
 
     where: List[str] = []
     params: List[Any] = []
 
-    if payload.name_like:
-        where.append("name LIKE ?")
-        params.append(build_like(payload.name_like))
+    # 述語は 等値/IN → 数値範囲 → LIKE の順に並べる（索引の効く等値条件を先頭に置く）
     if payload.type:
-        placeholders = ",".join(["?"] * len(payload.type))
+        placeholders = _placeholders(len(payload.type))
         where.append(f"type IN ({placeholders})")
         params.extend(payload.type)
     if payload.category:
-        placeholders = ",".join(["?"] * len(payload.category))
+        placeholders = _placeholders(len(payload.category))
         where.append(f"category IN ({placeholders})")
         params.extend(payload.category)
-    if payload.range_like:
-        where.append("range_ LIKE ?")
-        params.append(build_like(payload.range_like))
 
     # Flags exact matches
     if payload.direct_attack:
@@ -365,45 +757,65 @@ def search_moves_handler(payload: SearchMovesInput) -> Dict[str, Any]:
         where.append("substitute = ?")
         params.append(payload.substitute)
 
-    # Numeric ranges
-    nranges: List[Tuple[str, Optional[float], Optional[float]]] = [
-        ("power", payload.power_min, payload.power_max),
-        ("activation_time", payload.activation_time_min, payload.activation_time_max),
-        ("startup_time", payload.startup_time_min, payload.startup_time_max),
-        ("startup_time_q", payload.startup_time_q_min, payload.startup_time_q_max),
-        ("recovery_time", payload.recovery_time_min, payload.recovery_time_max),
-        ("total_time", payload.total_time_min, payload.total_time_max),
-        ("dps", payload.dps_min, payload.dps_max),
-    ]
-    for col, mn, mx in nranges:
+    # Numeric ranges (SQL fragments built at import time)
+    for min_field, max_field, ge_sql, le_sql in _MOVE_RANGED_SPECS:
+        mn = getattr(payload, min_field)
+        mx = getattr(payload, max_field)
         if mn is not None:
-            where.append(f"{col} >= ?")
+            where.append(ge_sql)
             params.append(mn)
         if mx is not None:
-            where.append(f"{col} <= ?")
+            where.append(le_sql)
             params.append(mx)
 
-    where_sql = (" WHERE " + " AND ".join(where)) if where else ""
+    # Partial matches
+    if payload.name_like:
+        where.append("name LIKE ?")
+        params.append(build_like(payload.name_like))
+    if payload.range_like:
+        where.append("range_ LIKE ?")
+        params.append(build_like(payload.range_like))
 
-    allowed_sort = [
-        "name",
-        "power",
-        "activation_time",
-        "startup_time",
-        "startup_time_q",
-        "recovery_time",
-        "total_time",
-        "dps",
-    ]
-    order_sql = _parse_sort(payload.sort, allowed_sort) if payload.sort else ""
-
-    limit = max(0, int(payload.limit or 10))
+    keys = _parse_sort_fast(payload.sort, ctx.move_sort_map)
     offset = max(0, int(payload.offset or 0))
+    if payload.cursor:
+        pred, pred_params = _keyset_predicate(keys, _decode_cursor(payload.cursor, keys))
+        where.append(pred)
+        params.extend(pred_params)
+        offset = 0
+
+    limit = max(0, int(payload.limit if payload.limit is not None else 10))
 
-    sql = f"SELECT {', '.join(select_cols)} FROM moves{where_sql}{order_sql} LIMIT ? OFFSET ?"
+    sql = _search_sql("moves", ctx.move_select_cols, tuple(where), tuple(k[2] for k in keys))
     params.extend([limit, offset])
-    items = execute_query(get_connection(), sql, params)
-    return {"items": items, "limit": limit, "offset": offset}
+    return _run_search(conn, sql, params, ctx.move_select_cols, keys, limit, offset)
+
+
+def search_moves_handler(
+    payload: SearchMovesInput, conn: Optional[sqlite3.Connection] = None
+) -> Dict[str, Any]:
+    return _columnar_to_items(search_moves_columnar_handler(payload, conn=conn))
+
+
+# -----------------------------
+# batch_search
+# -----------------------------
+_BATCH_HANDLERS = {
+    "search_pokemons": search_pokemons_handler,
+    "search_moves": search_moves_handler,
+}
+
+
+def batch_search_handler(payload: BatchSearchInput) -> Dict[str, Any]:
+    # 全リクエストを1本の接続で順に実行する（接続取得はバッチ全体で1回）
+    results: List[Dict[str, Any]] = []
+    with borrow_conn() as conn:
+        for i, req in enumerate(payload.requests):
+            try:
+                results.append(_BATCH_HANDLERS[req.kind](req, conn=conn))
+            except ValueError as e:
+                raise ValueError(f"requests[{i}]: {e}")
+    return {"results": results}
 
 
 # -----------------------------
@@ -413,59 +825,65 @@ def get_pokemon_detail_handler(payload: GetPokemonDetailInput) -> Dict[str, Any]
     if not payload.id and not payload.name:
         raise ValueError("Either id or name is required")
 
-    conn = get_connection()
-    psel = "*"
-
+    ctx = _schema_ctx(DEFAULT_DB_PATH)
     if payload.id:
-        pokemon = execute_one(conn, f"SELECT {psel} FROM pokemons WHERE id = ?", [payload.id])
+        target_sql, target = "?", payload.id
     else:
-        pokemon = execute_one(conn, f"SELECT {psel} FROM pokemons WHERE name = ?", [payload.name])
-    if not pokemon:
-        raise HTTPException(status_code=404, detail="Pokemon not found")
-
-    mcols = list(get_table_columns(conn, "moves"))
-    msel_base = [
-        "id",
-        "move_key",
-        "name",
-        "type",
-        "category",
-        "power",
-        "activation_time",
-        "startup_time",
-        "startup_time_q",
-        "startup_time_plus",
-        "recovery_time",
-        "total_time",
-        "total_time_plus",
-        "dps",
-        "direct_attack",
-        "finger_wag",
-        "protect",
-        "substitute",
-        "range_",
-        "effect",
-        "page_url",
-    ]
-    msel = ", ".join([f"m.{c}" for c in msel_base if c in mcols])
-
+        target_sql, target = "(SELECT id FROM pokemons WHERE name = ? LIMIT 1)", payload.name
+
+    if _cached_json1(DEFAULT_DB_PATH):
+        # json1 があれば技リストは SQLite 側で JSON 配列にまとめ、1行で受け取る。
+        # 要素は json_object で作り、配列は group_concat で連結する（json_group_array(json(...)) の再パースを避ける）。
+        # group_concat の連結順は SQLite の仕様上は不定（集約内 ORDER BY は 3.44 以降）なので、
+        # サブクエリの ORDER BY は目安とし、順序は受け取った後に Python 側で m.name 順へ並べ直して保証する
+        sql = f"""
+            SELECT {ctx.pokemon_select_sql_p}, (
+                SELECT '[' || coalesce(group_concat(x.item, ','), '') || ']' FROM (
+                    SELECT json_object(
+                        'learn_method', pm.learn_method, 'level', pm.level, 'tm_no', pm.tm_no,
+                        'move', {ctx.move_json_object_m}
+                    ) AS item
+                    FROM pokemon_moves pm
+                    JOIN moves m ON m.id = pm.move_id
+                    WHERE pm.pokemon_id = p.id
+                    ORDER BY m.name ASC
+                ) x
+            )
+            FROM pokemons p
+            WHERE p.id = {target_sql}
+        """
+        with borrow_conn() as conn:
+            _cols, rows = execute_query_columnar(conn, sql, (target,))
+        if not rows:
+            raise HTTPException(status_code=404, detail="Pokemon not found")
+        n = len(ctx.pokemon_select_cols)
+        moves = _json_loads(rows[0][n])
+        # 既に並んでいればほぼ O(n)。NULL の name は SQLite と同じく先頭
+        moves.sort(key=lambda x: (x["move"].get("name") is not None, x["move"].get("name") or ""))
+        return {"pokemon": dict(zip(ctx.pokemon_select_cols, rows[0][:n])), "moves": moves}
+
+    # 本体と覚える技を1本の LEFT JOIN で取得する（列は ポケモン / 覚え方3列 / 技 の順）
     sql = f"""
-        SELECT pm.learn_method, pm.level, pm.tm_no, {msel}
-        FROM pokemon_moves pm
-        JOIN moves m ON m.id = pm.move_id
-        WHERE pm.pokemon_id = ?
+        SELECT {ctx.pokemon_select_sql_p}, pm.learn_method, pm.level, pm.tm_no, {ctx.move_select_sql_m}
+        FROM pokemons p
+        LEFT JOIN pokemon_moves pm ON pm.pokemon_id = p.id
+        LEFT JOIN moves m ON m.id = pm.move_id
+        WHERE p.id = {target_sql}
         ORDER BY m.name ASC
     """
-    rows = execute_query(conn, sql, [pokemon["id"]])
+    with borrow_conn() as conn:
+        _cols, rows = execute_query_columnar(conn, sql, (target,))
+    if not rows:
+        raise HTTPException(status_code=404, detail="Pokemon not found")
+
+    n = len(ctx.pokemon_select_cols)
+    pokemon = dict(zip(ctx.pokemon_select_cols, rows[0][:n]))
     moves: List[Dict[str, Any]] = []
     for r in rows:
-        learn = {
-            "learn_method": r.get("learn_method"),
-            "level": r.get("level"),
-            "tm_no": r.get("tm_no"),
-        }
-        move = {k: v for k, v in r.items() if k not in ("learn_method", "level", "tm_no")}
-        moves.append({"learn_method": learn["learn_method"], "level": learn["level"], "tm_no": learn["tm_no"], "move": move})
+        if r[n + 3] is None:  # m.id が NULL = 覚える技が無い（LEFT JOIN の穴埋め行）
+            continue
+        move = dict(zip(ctx.move_select_cols, r[n + 3:]))
+        moves.append({"learn_method": r[n], "level": r[n + 1], "tm_no": r[n + 2], "move": move})
 
     return {"pokemon": pokemon, "moves": moves}
 
@@ -473,71 +891,88 @@ def get_pokemon_detail_handler(payload: GetPokemonDetailInput) -> Dict[str, Any]
 # -----------------------------
 # get_move_detail
 # -----------------------------
-def get_move_detail_handler(payload: GetMoveDetailInput) -> Dict[str, Any]:
+def _move_detail_query(payload: GetMoveDetailInput) -> Tuple[_SchemaCtx, Tuple[str, ...], str, Tuple[Any, ...]]:
     if not payload.id and not payload.name:
         raise ValueError("Either id or name is required")
 
-    conn = get_connection()
-    mcols = list(get_table_columns(conn, "moves"))
-    msel_base = [
-        "id",
-        "move_key",
-        "name",
-        "type",
-        "category",
-        "power",
-        "activation_time",
-        "startup_time",
-        "startup_time_q",
-        "startup_time_plus",
-        "recovery_time",
-        "total_time",
-        "total_time_plus",
-        "dps",
-        "direct_attack",
-        "finger_wag",
-        "protect",
-        "substitute",
-        "range_",
-        "effect",
-        "page_url",
-    ]
-    msel = ", ".join([c for c in msel_base if c in mcols])
-
+    ctx = _schema_ctx(DEFAULT_DB_PATH)
+    pcols = _pokemon_projection(ctx, payload.pokemon_fields)
     if payload.id:
-        move = execute_one(conn, f"SELECT {msel} FROM moves WHERE id = ?", [payload.id])
+        target_sql, target = "?", payload.id
     else:
-        move = execute_one(conn, f"SELECT {msel} FROM moves WHERE name = ?", [payload.name])
-    if not move:
-        raise HTTPException(status_code=404, detail="Move not found")
-
-    # Select all pokemon columns to be schema-agnostic (e.g., atk/def/spa/spd/spe)
-    psel = "p.*"
+        target_sql, target = "(SELECT id FROM moves WHERE name = ? LIMIT 1)", payload.name
 
+    # 技本体と覚えるポケモンを1本の LEFT JOIN で取得する（列は 技 / 覚え方3列 / ポケモン の順）
+    psel = ", ".join(f"p.{c}" for c in pcols)
     sql = f"""
-        SELECT pm.learn_method, pm.level, pm.tm_no, {psel}
-        FROM pokemon_moves pm
-        JOIN pokemons p ON p.id = pm.pokemon_id
-        WHERE pm.move_id = ?
+        SELECT {ctx.move_select_sql_m}, pm.learn_method, pm.level, pm.tm_no, {psel}
+        FROM moves m
+        LEFT JOIN pokemon_moves pm ON pm.move_id = m.id
+        LEFT JOIN pokemons p ON p.id = pm.pokemon_id
+        WHERE m.id = {target_sql}
         ORDER BY p.name ASC
     """
-    rows = execute_query(conn, sql, [move["id"]])
+    return ctx, pcols, sql, (target,)
+
+
+def get_move_detail_handler(payload: GetMoveDetailInput) -> Dict[str, Any]:
+    ctx, pcols, sql, params = _move_detail_query(payload)
+    with borrow_conn() as conn:
+        _cols, rows = execute_query_columnar(conn, sql, params)
+    if not rows:
+        raise HTTPException(status_code=404, detail="Move not found")
+
+    n = len(ctx.move_select_cols)
+    move = dict(zip(ctx.move_select_cols, rows[0][:n]))
     pokemons: List[Dict[str, Any]] = []
     for r in rows:
-        learn = {
-            "learn_method": r.get("learn_method"),
-            "level": r.get("level"),
-            "tm_no": r.get("tm_no"),
-        }
-        pokemon = {k: v for k, v in r.items() if k not in ("learn_method", "level", "tm_no")}
-        pokemons.append({"learn_method": learn["learn_method"], "level": learn["level"], "tm_no": learn["tm_no"], "pokemon": pokemon})
+        if r[n + 3] is None:  # p.id（射影の先頭）が NULL = 覚えるポケモンが無い
+            continue
+        pokemon = dict(zip(pcols, r[n + 3:]))
+        pokemons.append({"learn_method": r[n], "level": r[n + 1], "tm_no": r[n + 2], "pokemon": pokemon})
 
     return {"move": move, "pokemons": pokemons}
 
 
+STREAM_FETCH_SIZE = 256
+
+
+def _ndjson_line(obj: Any) -> bytes:
+    return _json_dumps(obj) + b"\n"
+
+
+def iter_move_detail_ndjson(payload: GetMoveDetailInput) -> Iterator[bytes]:
+    """get_move_detail の NDJSON 版。1行目が技本体、以降は覚えるポケモン1件ごとに1行。
+    行は STREAM_FETCH_SIZE 件ずつ取り出すので、全件をリストに溜めない。
+    技が無い場合は最初の next() で 404 を送出する（ルート側で先に1行目を取り出す）。"""
+    ctx, pcols, sql, params = _move_detail_query(payload)
+    n = len(ctx.move_select_cols)
+    with borrow_conn() as conn:
+        cur = conn.cursor()
+        cur.row_factory = None
+        cur.execute(sql, params)
+        rows = cur.fetchmany(STREAM_FETCH_SIZE)
+        if not rows:
+            raise HTTPException(status_code=404, detail="Move not found")
+        yield _ndjson_line(dict(zip(ctx.move_select_cols, rows[0][:n])))
+        while rows:
+            for r in rows:
+                if r[n + 3] is None:
+                    continue
+                yield _ndjson_line(
+                    {"learn_method": r[n], "level": r[n + 1], "tm_no": r[n + 2], "pokemon": dict(zip(pcols, r[n + 3:]))}
+                )
+            rows = cur.fetchmany(STREAM_FETCH_SIZE)
+
+
 # -----------------------------
 # Registration (MCP + REST)
 # -----------------------------
+def _json_response(handler: Any, payload: BaseModel) -> Response:
+    # SQLite 照会と JSON 化はどちらもブロッキングなので、まとめてワーカースレッドで行う（イベントループを塞がない）
+    return Response(content=_json_dumps(handler(payload)), media_type="application/json")
+
+
 def run_code_handler(payload: RunCodeInput) -> Dict[str, Any]:
     from src.code_environment import run_user_code_with_timeout
     out = run_user_code_with_timeout(
@@ -576,9 +1011,10 @@ def register_tools(app: FastAPI, mcp=None) -> None:
         name="search_pokemons",
         summary="Search Pokemons",
         description="ポケモンの検索。タイプ any/all、部分一致（name/obtain_method）、数値範囲、ソート、ページングに対応。",
-        response_model=SearchPokemonsOutput,
+        response_class=FastJSONResponse,
         responses={
             200: {
+                "model": SearchPokemonsOutput,
                 "description": "成功時のレスポンス",
                 "content": {
                     "application/json": {
@@ -587,7 +1023,8 @@ def register_tools(app: FastAPI, mcp=None) -> None:
                                 {"id": 6, "name": "ポカブ", "hp": 65}
                             ],
                             "limit": 10,
-                            "offset": 0
+                            "offset": 0,
+                            "next_cursor": None
                         }
                     }
                 }
@@ -596,7 +1033,7 @@ def register_tools(app: FastAPI, mcp=None) -> None:
     )
     def search_pokemons_route(payload: SearchPokemonsInput):
         try:
-            return search_pokemons_handler(payload)
+            return FastJSONResponse(search_pokemons_handler(payload))
         except ValueError as e:
             raise HTTPException(status_code=400, detail=str(e))
 
@@ -606,9 +1043,10 @@ def register_tools(app: FastAPI, mcp=None) -> None:
         name="search_moves",
         summary="Search Moves",
         description="技の検索。タイプ/分類、部分一致（name/range）、各数値範囲、フラグ（接触/ゆびをふる/まもる/みがわり）、ソート、ページングに対応。",
-        response_model=SearchMovesOutput,
+        response_class=FastJSONResponse,
         responses={
             200: {
+                "model": SearchMovesOutput,
                 "description": "成功時のレスポンス",
                 "content": {
                     "application/json": {
@@ -617,7 +1055,8 @@ def register_tools(app: FastAPI, mcp=None) -> None:
                                 {"id": 123, "name": "マッハパンチ", "dps": 8.5}
                             ],
                             "limit": 10,
-                            "offset": 0
+                            "offset": 0,
+                            "next_cursor": None
                         }
                     }
                 }
@@ -626,7 +1065,52 @@ def register_tools(app: FastAPI, mcp=None) -> None:
     )
     def search_moves_route(payload: SearchMovesInput):
         try:
-            return search_moves_handler(payload)
+            return FastJSONResponse(search_moves_handler(payload))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    @router.post(
+        "/search_pokemons_v2",
+        operation_id="search_pokemons_v2",
+        name="search_pokemons_v2",
+        summary="Search Pokemons (columnar)",
+        description="search_pokemons の列指向版。入力は同じで、結果を columns（列名）と rows（値の配列）で返します。",
+        response_class=FastJSONResponse,
+        responses={200: {"model": SearchPokemonsOutputV2}},
+    )
+    def search_pokemons_v2_route(payload: SearchPokemonsInput):
+        try:
+            return FastJSONResponse(search_pokemons_columnar_handler(payload))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    @router.post(
+        "/search_moves_v2",
+        operation_id="search_moves_v2",
+        name="search_moves_v2",
+        summary="Search Moves (columnar)",
+        description="search_moves の列指向版。入力は同じで、結果を columns（列名）と rows（値の配列）で返します。",
+        response_class=FastJSONResponse,
+        responses={200: {"model": SearchMovesOutputV2}},
+    )
+    def search_moves_v2_route(payload: SearchMovesInput):
+        try:
+            return FastJSONResponse(search_moves_columnar_handler(payload))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    @router.post(
+        "/batch_search",
+        operation_id="batch_search",
+        name="batch_search",
+        summary="Batch Search",
+        description="search_pokemons / search_moves を最大32件まとめて実行（1接続で順に処理）。結果は requests と同じ順序。",
+        response_class=FastJSONResponse,
+        responses={200: {"model": BatchSearchOutput}},
+    )
+    def batch_search_route(payload: BatchSearchInput):
+        try:
+            return FastJSONResponse(batch_search_handler(payload))
         except ValueError as e:
             raise HTTPException(status_code=400, detail=str(e))
 
@@ -636,9 +1120,10 @@ def register_tools(app: FastAPI, mcp=None) -> None:
         name="get_pokemon_detail",
         summary="Get Pokemon Detail",
         description="ポケモン詳細取得。ポケモン本体の情報に加えて、覚える技リスト（覚え方/レベル/tm_no 付き）を返します。",
-        response_model=PokemonDetailOutput,
+        response_class=FastJSONResponse,
         responses={
             200: {
+                "model": PokemonDetailOutput,
                 "description": "成功時のレスポンス",
                 "content": {
                     "application/json": {
@@ -658,9 +1143,9 @@ def register_tools(app: FastAPI, mcp=None) -> None:
             }
         }
     )
-    def get_pokemon_detail_route(payload: GetPokemonDetailInput):
+    async def get_pokemon_detail_route(payload: GetPokemonDetailInput):
         try:
-            return get_pokemon_detail_handler(payload)
+            return await asyncio.to_thread(_json_response, get_pokemon_detail_handler, payload)
         except ValueError as e:
             raise HTTPException(status_code=400, detail=str(e))
 
@@ -670,9 +1155,10 @@ def register_tools(app: FastAPI, mcp=None) -> None:
         name="get_move_detail",
         summary="Get Move Detail",
         description="技詳細取得。技本体の情報に加えて、その技を覚えるポケモン一覧（覚え方/レベル/tm_no 付き）を返します。",
-        response_model=MoveDetailOutput,
+        response_class=FastJSONResponse,
         responses={
             200: {
+                "model": MoveDetailOutput,
                 "description": "成功時のレスポンス",
                 "content": {
                     "application/json": {
@@ -692,11 +1178,28 @@ def register_tools(app: FastAPI, mcp=None) -> None:
             }
         }
     )
-    def get_move_detail_route(payload: GetMoveDetailInput):
+    async def get_move_detail_route(payload: GetMoveDetailInput):
+        try:
+            return await asyncio.to_thread(_json_response, get_move_detail_handler, payload)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    @router.post(
+        "/get_move_detail_stream",
+        operation_id="get_move_detail_stream",
+        name="get_move_detail_stream",
+        summary="Get Move Detail (NDJSON stream)",
+        description="get_move_detail のストリーミング版（application/x-ndjson）。1行目が技本体、以降は覚えるポケモン1件（覚え方/レベル/tm_no 付き）ごとに1行。",
+        response_class=StreamingResponse,
+        responses={200: {"content": {"application/x-ndjson": {}}}},
+    )
+    def get_move_detail_stream_route(payload: GetMoveDetailInput):
         try:
-            return get_move_detail_handler(payload)
+            lines = iter_move_detail_ndjson(payload)
+            first = next(lines)  # 404/400 はここで送出させ、ヘッダ送信前に返す
         except ValueError as e:
             raise HTTPException(status_code=400, detail=str(e))
+        return StreamingResponse(itertools.chain((first,), lines), media_type="application/x-ndjson")
 
     # Add run_code REST route
     long_desc = "ユーザーコードを安全サンドボックスで実行。SQLite は read-only で、sql()/scalar() ヘルパが利用可能。結果は result 変数で返す。"
@@ -739,6 +1242,24 @@ def register_tools(app: FastAPI, mcp=None) -> None:
                 output_model=SearchMovesOutput,
                 handler=search_moves_handler,
             )
+            mcp.register_tool(
+                name="search_pokemons_v2",
+                input_model=SearchPokemonsInput,
+                output_model=SearchPokemonsOutputV2,
+                handler=search_pokemons_columnar_handler,
+            )
+            mcp.register_tool(
+                name="search_moves_v2",
+                input_model=SearchMovesInput,
+                output_model=SearchMovesOutputV2,
+                handler=search_moves_columnar_handler,
+            )
+            mcp.register_tool(
+                name="batch_search",
+                input_model=BatchSearchInput,
+                output_model=BatchSearchOutput,
+                handler=batch_search_handler,
+            )
             mcp.register_tool(
                 name="get_pokemon_detail",
                 input_model=GetPokemonDetailInput,
@@ -766,6 +1287,9 @@ def register_tools(app: FastAPI, mcp=None) -> None:
         if hasattr(mcp, "tool"):
             mcp.tool(name="search_pokemons", input_model=SearchPokemonsInput, output_model=dict)(search_pokemons_handler)
             mcp.tool(name="search_moves", input_model=SearchMovesInput, output_model=dict)(search_moves_handler)
+            mcp.tool(name="search_pokemons_v2", input_model=SearchPokemonsInput, output_model=dict)(search_pokemons_columnar_handler)
+            mcp.tool(name="search_moves_v2", input_model=SearchMovesInput, output_model=dict)(search_moves_columnar_handler)
+            mcp.tool(name="batch_search", input_model=BatchSearchInput, output_model=dict)(batch_search_handler)
             mcp.tool(name="get_pokemon_detail", input_model=GetPokemonDetailInput, output_model=dict)(get_pokemon_detail_handler)
             mcp.tool(name="get_move_detail", input_model=GetMoveDetailInput, output_model=dict)(get_move_detail_handler)
             mcp.tool(name="run_code", input_model=RunCodeInput, output_model=RunCodeOutput)(run_code_handler)